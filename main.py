@@ -6,10 +6,51 @@
 
 import os
 import sys
-from modules.database import initialize_database
+import atexit
+from modules.database import initialize_database, close_pool
+from modules.security_utils import shutdown_hash_pool
+from modules.breach_corpus import close_breach_corpus
 from modules.admin_portal import admin_login
 from modules.user_portal import register, login
-from modules.activity_logger import log_action
+from modules.activity_logger import log_action, shutdown_logger
+from modules.event_types import EventType
+
+STARTUP_PROFILE_TOP = 15
+
+def shutdown():
+    """Drain buffered logs and release pooled resources before the interpreter exits"""
+    shutdown_logger()
+    close_pool()
+    shutdown_hash_pool()
+    close_breach_corpus()
+
+def profile_startup(top=STARTUP_PROFILE_TOP):
+    """Print a python -X importtime breakdown of the application's startup imports"""
+    import subprocess
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    
+    packages = {}
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+        total_us += int(self_us)
+    
+    print_section_header("STARTUP IMPORT PROFILE")
+    print(f"  {'PACKAGE':<30} {'SELF (ms)':>10} {'SHARE':>8}")
+    print_separator("-")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {package:<30} {self_us / 1000:>10.1f} {self_us / max(total_us, 1):>8.1%}")
+    print_separator("-")
+    print(f"  {'Total':<30} {total_us / 1000:>10.1f}")
+    for heavy in ("pandas", "numpy"):
+        print(f"  {heavy} loaded at startup: {'yes' if heavy in packages else 'no'}")
+    if result.returncode:
+        print(f"\n  ⚠ Import failed:\n{result.stderr.strip().splitlines()[-1]}")
 
 def clear_screen():
     """Clear the terminal screen based on operating system"""
@@ -92,7 +133,7 @@ def main_menu():
                 print("\n  Thank you for using Password & Security Toolkit!")
                 print("  Exiting application...\n")
                 print_separator("=")
-                log_action("System", "Application shutdown")
+                log_action("System", "Application shutdown", EventType.SYSTEM)
                 sys.exit(0)
                 
             else:
@@ -110,13 +151,18 @@ def main_menu():
             input("\n  Press Enter to continue...")
 
 if __name__ == "__main__":
+    if "--profile-startup" in sys.argv[1:]:
+        profile_startup()
+        sys.exit(0)
+    
+    atexit.register(shutdown)
     try:
         print_banner()
         print("  Initializing database...")
         initialize_database()
         print("  ✓ Database initialized successfully")
         print("  ✓ System ready")
-        log_action("System", "Application started")
+        log_action("System", "Application started", EventType.SYSTEM)
         input("\n  Press Enter to continue...")
         print()
         print()
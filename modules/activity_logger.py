@@ -1,68 +1,458 @@
+import os
+import re
+import gzip
+import json
+import mmap
+import atexit
 import datetime
-import pandas as pd
-import numpy as np
+import queue
+import sqlite3
+import threading
+from collections import Counter, OrderedDict
 from pathlib import Path
+from modules.activity_stats import (record_events, save_snapshot, save_snapshot_if_due, get_statistics, needs_rebuild,
+                                    rebuild_statistics)
+from modules.event_types import EventType, EVENT_NAMES, classify_action, encode_action, decode_action
 
 LOG_FILE = "activity.log"
+LOG_FLUSH_INTERVAL = 1.0
+LOG_FLUSH_SIZE = 100
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_MAX_AGE = 7 * 24 * 60 * 60
+LOG_MANIFEST = LOG_FILE + ".manifest.json"
+SEGMENT_CACHE_SIZE = 8
+LOG_COLUMNS = ['Timestamp', 'Username', 'Action', 'Event']
+FINGERPRINT_BYTES = 64
+LOG_BACKEND = os.environ.get("TOOLKIT_LOG_BACKEND", "text")
 
-def log_action(username, action):
+_log_queue = queue.Queue()
+_write_lock = threading.RLock()
+_wake = threading.Event()
+_stop = threading.Event()
+_writer = None
+_writer_lock = threading.Lock()
+# Events taken off the queue whose write failed; written first on the next flush
+_pending = []
+
+_binary_log = None
+
+def get_binary_log():
+    global _binary_log
+    if _binary_log is None:
+        from modules.binary_log import BinaryLog
+        _binary_log = BinaryLog()
+    return _binary_log
+
+def _drain_queue():
+    events = []
+    while True:
+        try:
+            events.append(_log_queue.get_nowait())
+        except queue.Empty:
+            return events
+
+def _write_events(events):
+    if LOG_BACKEND == "binary":
+        get_binary_log().append(events)
+        return
+    if LOG_BACKEND == "sqlite":
+        from modules.activity_store import append_events
+        append_events(events)
+        return
     with open(LOG_FILE, "a") as f:
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        f.write(f"[{timestamp}] {username}: {action}\n")
+        f.write("".join(f"[{moment.strftime('%Y-%m-%d %H:%M:%S')}] {username}: {encode_action(action, event)}\n"
+                        for moment, username, action, event in events))
+
+def flush_logs():
+    global _pending
+    # Draining and writing under one lock keeps events in submission order
+    with _write_lock:
+        events = _pending + _drain_queue()
+        if not events:
+            return
+        try:
+            _write_events(events)
+        except BaseException:
+            _pending = events
+            raise
+        _pending = []
+        record_events(events)
+
+def rebuild_activity_statistics():
+    with _write_lock:
+        flush_logs()
+        return rebuild_statistics()
+
+def _writer_loop():
+    while not _stop.is_set():
+        _wake.wait(LOG_FLUSH_INTERVAL)
+        _wake.clear()
+        try:
+            flush_logs()
+            if needs_rebuild():
+                rebuild_activity_statistics()
+            rotate_logs()
+            save_snapshot_if_due()
+        except (OSError, sqlite3.Error):
+            # Keep the flusher alive; queued lines are retried on the next pass
+            pass
+    flush_logs()
+
+def _ensure_writer():
+    global _writer
+    if _writer is not None and _writer.is_alive():
+        return
+    with _writer_lock:
+        if _writer is None:
+            atexit.register(shutdown_logger)
+        if _writer is None or not _writer.is_alive():
+            _stop.clear()
+            _writer = threading.Thread(target=_writer_loop, name="activity-log-writer", daemon=True)
+            _writer.start()
+
+def shutdown_logger(timeout=5.0):
+    _stop.set()
+    _wake.set()
+    if _writer is not None and _writer.is_alive():
+        _writer.join(timeout)
+    flush_logs()
+    save_snapshot()
+
+def configure_logger(flush_interval=None, flush_size=None):
+    global LOG_FLUSH_INTERVAL, LOG_FLUSH_SIZE
+    if flush_interval is not None:
+        LOG_FLUSH_INTERVAL = flush_interval
+    if flush_size is not None:
+        LOG_FLUSH_SIZE = flush_size
+
+def log_action(username, action, event=None):
+    # event is an EventType; callers that omit it get the legacy prefix classification
+    event = classify_action(action) if event is None else EventType(event)
+    moment = datetime.datetime.now().replace(microsecond=0)
+    _log_queue.put((moment, username, action, event))
+    if _stop.is_set():
+        # Logger already shut down (e.g. during exit); write through
+        flush_logs()
+        return
+    _ensure_writer()
+    if _log_queue.qsize() >= LOG_FLUSH_SIZE:
+        _wake.set()
 
 def view_logs():
+    flush_logs()
+    if LOG_BACKEND != "text":
+        df = get_logs_dataframe()
+        lines = "".join(f"[{ts}] {user}: {action}\n"
+                        for ts, user, action in zip(df['Timestamp'], df['Username'], df['Action']))
+        return lines or "No logs available."
+    parts = []
+    for entry in load_manifest()['segments']:
+        with gzip.open(entry['file'], "rt", encoding="utf-8", errors="replace") as f:
+            parts.append(f.read())
     try:
         with open(LOG_FILE, "r") as f:
-            return f.read()
+            parts.append(f.read())
     except FileNotFoundError:
-        return "No logs available."
+        pass
+    return _EVENT_CODE_PATTERN.sub("", "".join(parts)) or "No logs available."
+
+_EVENT_CODE_PATTERN = re.compile(r"\t#\d+$", re.MULTILINE)
 
-def get_logs_dataframe():
+def load_manifest():
     try:
-        if not Path(LOG_FILE).exists():
-            return pd.DataFrame(columns=['Timestamp', 'Username', 'Action'])
-        
-        logs = []
-        with open(LOG_FILE, "r") as f:
+        with open(LOG_MANIFEST, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'segments': []}
+
+def _save_manifest(manifest):
+    tmp_file = LOG_MANIFEST + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_file, LOG_MANIFEST)
+
+def _first_timestamp(path):
+    try:
+        with open(path, "r", errors="replace") as f:
+            line = f.readline()
+    except FileNotFoundError:
+        return None
+    logs = _parse_log_lines([line])
+    return logs[0]['Timestamp'] if logs else None
+
+def _rotation_due():
+    try:
+        size = os.path.getsize(LOG_FILE)
+    except FileNotFoundError:
+        return False
+    if size >= LOG_MAX_BYTES:
+        return True
+    first = _first_timestamp(LOG_FILE)
+    if not first or not size:
+        return False
+    try:
+        started = datetime.datetime.strptime(first, "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return False
+    return (datetime.datetime.now() - started).total_seconds() >= LOG_MAX_AGE
+
+def _seal_segment(pending_path):
+    manifest = load_manifest()
+    number = max((entry['number'] for entry in manifest['segments']), default=0) + 1
+    segment_file = f"{LOG_FILE}.{number}.gz"
+    
+    rows = 0
+    first_ts = last_ts = None
+    user_counts = Counter()
+    with open(pending_path, "rb") as src, gzip.open(segment_file + ".tmp", "wb") as dst:
+        for raw in src:
+            dst.write(raw)
+            for log in _parse_log_lines([raw.decode("utf-8", errors="replace")]):
+                rows += 1
+                first_ts = first_ts or log['Timestamp']
+                last_ts = log['Timestamp']
+                user_counts[log['Username']] += 1
+    os.replace(segment_file + ".tmp", segment_file)
+    
+    manifest['segments'].append({
+        'number': number,
+        'file': segment_file,
+        'first_timestamp': first_ts,
+        'last_timestamp': last_ts,
+        'rows': rows,
+        'user_counts': dict(user_counts),
+    })
+    _save_manifest(manifest)
+    os.remove(pending_path)
+
+def rotate_logs(force=False):
+    if LOG_BACKEND != "text":
+        # Segment rotation only applies to the text log
+        return False
+    pending_path = LOG_FILE + ".rotating"
+    with _write_lock:
+        # Finish a rotation interrupted after the rename but before sealing
+        if os.path.exists(pending_path):
+            _seal_segment(pending_path)
+        due = _rotation_due() or (force and os.path.exists(LOG_FILE) and os.path.getsize(LOG_FILE) > 0)
+        if not due:
+            return False
+        # Renaming first means new events go to a fresh file straight away
+        os.replace(LOG_FILE, pending_path)
+        _seal_segment(pending_path)
+    return True
+
+def _segments_in_window(start=None, end=None, username=None):
+    for entry in load_manifest()['segments']:
+        if not entry['rows']:
+            continue
+        if start and entry['last_timestamp'] < start:
+            continue
+        if end and entry['first_timestamp'] > end:
+            continue
+        if username is not None and not entry['user_counts'].get(username):
+            continue
+        yield entry
+
+_segment_cache = OrderedDict()
+_segment_lock = threading.Lock()
+
+def _segment_frame(entry):
+    # Sealed segments never change, so their parsed frames can be reused
+    with _segment_lock:
+        frame = _segment_cache.get(entry['file'])
+        if frame is not None:
+            _segment_cache.move_to_end(entry['file'])
+            return frame
+    with gzip.open(entry['file'], "rt", encoding="utf-8", errors="replace") as f:
+        frame = _logs_frame(_parse_log_lines(f))
+    with _segment_lock:
+        _segment_cache[entry['file']] = frame
+        if len(_segment_cache) > SEGMENT_CACHE_SIZE:
+            _segment_cache.popitem(last=False)
+    return frame
+
+# Parsed view of LOG_FILE plus the byte offset it covers, so each call only
+# parses lines appended since the previous one.
+_parse_cache = {'path': None, 'file_id': None, 'head': b"", 'offset': 0, 'frame': None}
+_parse_lock = threading.Lock()
+
+def _parse_log_line(line):
+    parts = line.strip().split("] ", 1)
+    if len(parts) == 2:
+        timestamp = parts[0].replace("[", "")
+        rest = parts[1].split(": ", 1)
+        if len(rest) == 2:
+            username, action = rest
+            action, event = decode_action(action)
+            return {
+                'Timestamp': timestamp,
+                'Username': username,
+                'Action': action,
+                'Event': int(event)
+            }
+    return None
+
+def _parse_log_lines(lines):
+    logs = []
+    for line in lines:
+        if line.strip():
+            log = _parse_log_line(line)
+            if log is not None:
+                logs.append(log)
+    return logs
+
+def iter_log_events():
+    # Every event in the sealed segments and then the live log, as
+    # (datetime, username, action, event) tuples, read one line at a time
+    flush_logs()
+    sources = [entry['file'] for entry in load_manifest()['segments']]
+    if os.path.exists(LOG_FILE):
+        sources.append(LOG_FILE)
+    for source in sources:
+        opener = gzip.open if source.endswith(".gz") else open
+        with opener(source, "rt", encoding="utf-8", errors="replace") as f:
             for line in f:
-                if line.strip():
-                    parts = line.strip().split("] ", 1)
-                    if len(parts) == 2:
-                        timestamp = parts[0].replace("[", "")
-                        rest = parts[1].split(": ", 1)
-                        if len(rest) == 2:
-                            username, action = rest
-                            logs.append({
-                                'Timestamp': timestamp,
-                                'Username': username,
-                                'Action': action
-                            })
+                log = _parse_log_line(line) if line.strip() else None
+                if log is None:
+                    continue
+                try:
+                    moment = datetime.datetime.strptime(log['Timestamp'], "%Y-%m-%d %H:%M:%S")
+                except ValueError:
+                    continue
+                yield moment, log['Username'], log['Action'], log['Event']
+
+def event_column(codes):
+    import numpy as np
+    import pandas as pd
+    
+    # Event codes are the category codes, so filters compare small integers
+    return pd.Categorical.from_codes(np.asarray(codes, dtype=np.int8), categories=EVENT_NAMES)
+
+def _logs_frame(logs):
+    import pandas as pd
+    
+    frame = pd.DataFrame(logs, columns=LOG_COLUMNS)
+    frame['Event'] = event_column(frame['Event'])
+    return frame
+
+def events_of_type(df, *events):
+    import numpy as np
+    
+    if df.empty:
+        return df
+    return df[np.isin(df['Event'].cat.codes.to_numpy(), [int(event) for event in events])]
+
+def _reset_parse_cache(path, file_id, head):
+    _parse_cache.update(path=path, file_id=file_id, head=head, offset=0,
+                        frame=_logs_frame([]))
+
+def _active_log_frame():
+    import pandas as pd
+    
+    try:
+        if not Path(LOG_FILE).exists():
+            return _logs_frame([])
         
-        return pd.DataFrame(logs)
+        with _parse_lock, open(LOG_FILE, "rb") as f:
+            stat = os.fstat(f.fileno())
+            file_id = (stat.st_dev, stat.st_ino)
+            head = f.read(FINGERPRINT_BYTES)
+            cache = _parse_cache
+            
+            # A new inode, a shrunken file or rewritten leading bytes means the
+            # log was rotated or truncated: start over from the beginning.
+            if (cache['frame'] is None or cache['path'] != LOG_FILE or cache['file_id'] != file_id
+                    or stat.st_size < cache['offset'] or not head.startswith(cache['head'])):
+                _reset_parse_cache(LOG_FILE, file_id, head)
+            
+            if stat.st_size > cache['offset']:
+                f.seek(cache['offset'])
+                data = f.read(stat.st_size - cache['offset'])
+                # Leave a partially written trailing line for the next call
+                end = data.rfind(b"\n") + 1
+                if end:
+                    logs = _parse_log_lines(data[:end].decode("utf-8", errors="replace").splitlines())
+                    if logs:
+                        tail = _logs_frame(logs)
+                        cache['frame'] = tail if cache['frame'].empty else pd.concat([cache['frame'], tail],
+                                                                                     ignore_index=True)
+                    cache['offset'] += end
+                    cache['head'] = head
+            
+            return cache['frame'].copy(deep=False)
     except Exception as e:
-        return pd.DataFrame(columns=['Timestamp', 'Username', 'Action'])
+        return _logs_frame([])
 
-def get_user_activity_summary(username):
-    df = get_logs_dataframe()
-    if df.empty:
-        return None
+def get_logs_dataframe(start=None, end=None, username=None):
+    import pandas as pd
     
-    user_logs = df[df['Username'] == username]
+    # start/end are "YYYY-MM-DD HH:MM:SS" strings; segments outside the
+    # window (or without events for username) are skipped via the manifest
+    flush_logs()
+    if LOG_BACKEND == "binary":
+        return get_binary_log().dataframe(start, end, username)
+    if LOG_BACKEND == "sqlite":
+        from modules.activity_store import get_logs_dataframe as get_store_dataframe
+        return get_store_dataframe(start, end, username)
+    frames = [_segment_frame(entry) for entry in _segments_in_window(start, end, username)]
+    frames.append(_active_log_frame())
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return _logs_frame([])
+    
+    df = frames[0].copy(deep=False) if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    if start:
+        df = df[df['Timestamp'] >= start]
+    if end:
+        df = df[df['Timestamp'] <= end]
+    if username is not None:
+        df = df[df['Username'] == username]
+    return df
+
+def get_user_events(username, *events):
+    if LOG_BACKEND == "sqlite":
+        from modules.activity_store import get_user_events as get_store_events
+        flush_logs()
+        return get_store_events(username, events)
+    return events_of_type(get_logs_dataframe(username=username), *events)
+
+def _observed_counts(column):
+    # Categorical columns (binary backend) also report categories with no rows
+    counts = column.value_counts()
+    return counts[counts > 0].to_dict()
+
+def get_user_activity_summary(username, start=None, end=None):
+    if LOG_BACKEND == "sqlite":
+        from modules.activity_store import get_user_activity_summary as get_store_summary
+        flush_logs()
+        return get_store_summary(username, start, end)
+    user_logs = get_logs_dataframe(start, end, username)
     if user_logs.empty:
         return None
     
     summary = {
         'total_actions': len(user_logs),
-        'login_count': len(user_logs[user_logs['Action'].str.contains('Logged in', case=False, na=False)]),
+        'login_count': len(events_of_type(user_logs, EventType.LOGIN)),
         'last_action': user_logs.iloc[-1]['Action'] if not user_logs.empty else 'N/A',
         'last_seen': user_logs.iloc[-1]['Timestamp'] if not user_logs.empty else 'N/A',
-        'actions_breakdown': user_logs['Action'].value_counts().to_dict()
+        'actions_breakdown': _observed_counts(user_logs['Action'])
     }
     
     return summary
 
-def get_activity_statistics():
-    df = get_logs_dataframe()
+def get_activity_statistics(start=None, end=None):
+    if start is None and end is None:
+        # Whole-log statistics come from the running totals
+        flush_logs()
+        if needs_rebuild():
+            rebuild_activity_statistics()
+        return get_statistics()
+    if LOG_BACKEND == "sqlite":
+        from modules.activity_store import get_activity_statistics as get_store_statistics
+        flush_logs()
+        return get_store_statistics(start, end)
+    df = get_logs_dataframe(start, end)
     if df.empty:
         return None
     
@@ -70,28 +460,62 @@ def get_activity_statistics():
         'total_logs': len(df),
         'unique_users': df['Username'].nunique(),
         'most_active_user': df['Username'].mode()[0] if not df.empty else 'N/A',
-        'actions_per_user': df.groupby('Username').size().to_dict(),
+        'actions_per_user': df.groupby('Username', observed=True).size().to_dict(),
         'recent_activity': df.tail(10).to_dict('records')
     }
     
     return stats
 
+def _tail_lines(path, limit):
+    # Walk back from the end of the file to the start of the last `limit` lines
+    try:
+        with open(path, "rb") as f:
+            if not os.fstat(f.fileno()).st_size:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                # Leave a partially written trailing line out, as _active_log_frame() does
+                end = data.rfind(b"\n") + 1
+                start = end
+                for _ in range(limit):
+                    if start <= 0:
+                        break
+                    start = data.rfind(b"\n", 0, start - 1) + 1
+                return data[start:end].decode("utf-8", errors="replace").splitlines()
+    except FileNotFoundError:
+        return []
+
+def tail_logs(limit):
+    import pandas as pd
+    
+    flush_logs()
+    if LOG_BACKEND == "binary":
+        log = get_binary_log()
+        return log.to_dataframe(log.read_events(last=limit))
+    if LOG_BACKEND == "sqlite":
+        from modules.activity_store import get_recent_logs
+        return get_recent_logs(limit)
+    
+    frames = [_logs_frame(_parse_log_lines(_tail_lines(LOG_FILE, limit)))]
+    missing = limit - len(frames[0])
+    # Only reach into sealed segments when the active file is shorter than limit
+    for entry in reversed(load_manifest()['segments']):
+        if missing <= 0:
+            break
+        if entry['rows']:
+            frame = _segment_frame(entry).tail(missing)
+            frames.insert(0, frame)
+            missing -= len(frame)
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return _logs_frame([])
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
 def display_logs_table(limit=None):
-    df = get_logs_dataframe()
+    df = tail_logs(limit) if limit else get_logs_dataframe()
     if df.empty:
         return "No logs available."
     
-    if limit:
-        df = df.tail(limit)
-    
-    output = "\n"
-    output += "=" * 100 + "\n"
-    output += f"{'TIMESTAMP':<20} {'USERNAME':<20} {'ACTION':<60}\n"
-    output += "=" * 100 + "\n"
-    
-    for _, row in df.iterrows():
-        output += f"{row['Timestamp']:<20} {row['Username']:<20} {row['Action']:<60}\n"
-    
-    output += "=" * 100 + "\n"
-    
-    return output
+    rule = "=" * 100
+    rows = [f"{ts:<20} {user:<20} {action:<60}"
+            for ts, user, action in zip(df['Timestamp'], df['Username'], df['Action'])]
+    return "\n".join(["", rule, f"{'TIMESTAMP':<20} {'USERNAME':<20} {'ACTION':<60}", rule, *rows, rule, ""])
@@ -0,0 +1,207 @@
+import os
+import json
+import time
+import datetime
+import threading
+from collections import Counter, deque
+from modules.event_types import EVENT_NAMES
+from modules.file_lock import file_lock
+
+STATS_SNAPSHOT = "activity_stats.json"
+STATS_SNAPSHOT_VERSION = 3
+STATS_SNAPSHOT_INTERVAL = 30.0
+RECENT_EVENTS = 50
+HOURLY_WINDOW = datetime.timedelta(days=7)
+
+# Running totals updated as the log writer commits each batch, so the
+# statistics screen never rescans the log. Persisted to STATS_SNAPSHOT; when
+# the snapshot is missing or unreadable, batches are not counted until
+# activity_logger rebuilds the totals from the raw log in the background.
+# Several processes may share the snapshot, so each one saves only the
+# events it counted since its last save (_delta), merged under a file lock.
+_state = None
+_delta = None
+_state_lock = threading.RLock()
+_dirty = False
+_replace = False
+_last_saved = 0.0
+
+def _empty_state():
+    return {
+        'total': 0,
+        'users': Counter(),
+        'actions': Counter(),
+        'recent': deque(maxlen=RECENT_EVENTS),
+        'hourly': {},
+        'top_user': None,
+    }
+
+def _prune_hourly(hourly):
+    # Keep the 7 days up to the newest hour with events
+    cutoff = (datetime.datetime.strptime(max(hourly), "%Y-%m-%d %H") - HOURLY_WINDOW).strftime("%Y-%m-%d %H")
+    for hour in [hour for hour in hourly if hour <= cutoff]:
+        del hourly[hour]
+
+def _apply(state, timestamp, username, action, event):
+    state['total'] += 1
+    users = state['users']
+    users[username] += 1
+    # Counts only grow, so the leader can only change to the user just updated
+    if state['top_user'] is None or users[username] > users[state['top_user']]:
+        state['top_user'] = username
+    state['actions'][EVENT_NAMES[event]] += 1
+    state['recent'].append((timestamp, username, action, EVENT_NAMES[event]))
+    hourly = state['hourly']
+    hour = timestamp[:13]
+    if hour in hourly:
+        hourly[hour] += 1
+    else:
+        hourly[hour] = 1
+        _prune_hourly(hourly)
+
+def _merge(state, delta):
+    state['total'] += delta['total']
+    state['users'].update(delta['users'])
+    state['actions'].update(delta['actions'])
+    # Stable sort, so events with equal timestamps keep the snapshot's order first
+    recent = sorted(list(state['recent']) + list(delta['recent']), key=lambda e: e[0])
+    state['recent'].clear()
+    state['recent'].extend(recent[-RECENT_EVENTS:])
+    for hour, count in delta['hourly'].items():
+        state['hourly'][hour] = state['hourly'].get(hour, 0) + count
+    if state['hourly']:
+        _prune_hourly(state['hourly'])
+    # Which process reached a tied count first is unknown, so ties keep the snapshot's leader
+    users = state['users']
+    if users and (state['top_user'] is None or users[state['top_user']] < max(users.values())):
+        state['top_user'] = max(users, key=users.get)
+    return state
+
+def _load_snapshot():
+    try:
+        with open(STATS_SNAPSHOT, "r") as f:
+            data = json.load(f)
+        if data.get('version') != STATS_SNAPSHOT_VERSION:
+            return None
+        state = _empty_state()
+        state['total'] = data['total']
+        state['users'].update(data['users'])
+        state['actions'].update(data['actions'])
+        state['recent'].extend(tuple(event) for event in data['recent'])
+        state['hourly'].update(data['hourly'])
+        state['top_user'] = data['top_user']
+        return state
+    except (FileNotFoundError, ValueError, KeyError, TypeError):
+        return None
+
+def _loaded_state():
+    global _state, _delta
+    if _state is None:
+        _state = _load_snapshot()
+        _delta = _empty_state()
+    return _state
+
+def needs_rebuild():
+    with _state_lock:
+        return _loaded_state() is None
+
+def record_events(events):
+    # events: batch of (datetime, username, action, event) the log writer just committed
+    global _dirty
+    with _state_lock:
+        state = _loaded_state()
+        if state is None:
+            # Already in the log, so the pending rebuild counts them
+            return
+        for moment, username, action, event in events:
+            timestamp = moment.strftime("%Y-%m-%d %H:%M:%S")
+            _apply(state, timestamp, username, action, event)
+            _apply(_delta, timestamp, username, action, event)
+        _dirty = True
+
+def save_snapshot():
+    global _state, _delta, _dirty, _replace, _last_saved
+    with _state_lock:
+        if _state is None:
+            return
+        with file_lock(STATS_SNAPSHOT + ".lock"):
+            # Other processes may have saved since this one loaded; add our events to theirs.
+            # A rebuild has just recounted the whole log, so it replaces the snapshot outright.
+            current = None if _replace else _load_snapshot()
+            if current is not None:
+                _state = _merge(current, _delta)
+            data = {
+                'version': STATS_SNAPSHOT_VERSION,
+                'total': _state['total'],
+                'users': dict(_state['users']),
+                'actions': dict(_state['actions']),
+                'recent': list(_state['recent']),
+                'hourly': dict(sorted(_state['hourly'].items())),
+                'top_user': _state['top_user'],
+            }
+            tmp_file = STATS_SNAPSHOT + ".tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_file, STATS_SNAPSHOT)
+        _delta = _empty_state()
+        _dirty = False
+        _replace = False
+        _last_saved = time.monotonic()
+
+def save_snapshot_if_due():
+    if _dirty and time.monotonic() - _last_saved >= STATS_SNAPSHOT_INTERVAL:
+        save_snapshot()
+
+def rebuild_statistics():
+    # Callers hold the log write lock (activity_logger.rebuild_activity_statistics)
+    # so no batch is written, and counted, while the log is being read
+    global _state, _delta, _dirty, _replace
+    from modules.activity_logger import get_logs_dataframe
+
+    with _state_lock:
+        df = get_logs_dataframe()
+        state = _empty_state()
+        if not df.empty:
+            state['total'] = len(df)
+            usernames = df['Username'].astype(str).reset_index(drop=True)
+            user_counts = usernames.value_counts()
+            state['users'].update({user: int(count) for user, count in user_counts.items()})
+            # As in _apply(), a tie goes to the user who reached the count first,
+            # i.e. the tied user whose last event comes earliest
+            tied = usernames[usernames.isin(user_counts.index[user_counts == user_counts.max()])]
+            last_events = tied.drop_duplicates(keep='last')
+            state['top_user'] = last_events[last_events.index.min()]
+            for event, count in df['Event'].value_counts().items():
+                if count:
+                    state['actions'][str(event)] += int(count)
+            recent = df.tail(RECENT_EVENTS)
+            state['recent'].extend(zip(recent['Timestamp'].astype(str), recent['Username'].astype(str),
+                                       recent['Action'].astype(str), recent['Event'].astype(str)))
+            hourly = df['Timestamp'].astype(str).str[:13].value_counts()
+            # Hand-edited or damaged log lines can carry timestamps that are not dates
+            hourly = hourly[hourly.index.str.fullmatch(r"\d{4}-\d\d-\d\d \d\d")]
+            state['hourly'].update((hour, int(count)) for hour, count in hourly.items())
+            if state['hourly']:
+                _prune_hourly(state['hourly'])
+        _state = state
+        _delta = _empty_state()
+        _dirty = True
+        _replace = True
+    save_snapshot()
+    return state['total']
+
+def get_statistics(recent=10):
+    with _state_lock:
+        state = _loaded_state()
+        if state is None or not state['total']:
+            return None
+        return {
+            'total_logs': state['total'],
+            'unique_users': len(state['users']),
+            'most_active_user': state['top_user'],
+            'actions_per_user': dict(state['users']),
+            'actions_per_type': dict(state['actions']),
+            'hourly_activity': dict(sorted(state['hourly'].items())),
+            'recent_activity': [{'Timestamp': ts, 'Username': user, 'Action': action, 'Event': event}
+                                for ts, user, action, event in list(state['recent'])[-recent:]]
+        }
@@ -0,0 +1,146 @@
+import sys
+import argparse
+from modules.database import get_connection, initialize_database
+from modules.event_types import EventType, EVENT_NAMES
+
+LOG_COLUMNS = ['Timestamp', 'Username', 'Action', 'Event']
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+IMPORT_BATCH_SIZE = 10000
+
+# "{where}" is filled in by _where()
+EVENTS_SQL = "SELECT ts, username, action, event FROM activity_log{where} ORDER BY ts, id"
+USER_EVENTS_SQL = "SELECT ts, username, action, event FROM activity_log WHERE username=? AND event IN ({codes}) ORDER BY ts, id"
+SUMMARY_COUNTS_SQL = f"SELECT COUNT(*), COALESCE(SUM(event={int(EventType.LOGIN)}), 0) FROM activity_log{{where}}"
+LAST_ACTION_SQL = "SELECT ts, action FROM activity_log{where} ORDER BY ts DESC, id DESC LIMIT 1"
+ACTION_BREAKDOWN_SQL = "SELECT action, COUNT(*) AS n FROM activity_log{where} GROUP BY action ORDER BY n DESC"
+
+def append_events(events):
+    # events: iterable of (datetime, username, action, event)
+    rows = [(moment.strftime(TIMESTAMP_FORMAT), username, action, int(event))
+            for moment, username, action, event in events]
+    if not rows:
+        return
+    with get_connection() as conn:
+        conn.executemany("INSERT INTO activity_log (ts, username, action, event) VALUES (?, ?, ?, ?)", rows)
+
+def _where(start=None, end=None, username=None):
+    clauses, params = [], []
+    if username is not None:
+        clauses.append("username=?")
+        params.append(username)
+    if start:
+        clauses.append("ts >= ?")
+        params.append(start)
+    if end:
+        clauses.append("ts <= ?")
+        params.append(end)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+def _frame(rows):
+    import pandas as pd
+
+    df = pd.DataFrame(rows, columns=LOG_COLUMNS)
+    df['Event'] = pd.Categorical.from_codes(df['Event'].astype('int8'), categories=EVENT_NAMES)
+    return df
+
+def get_logs_dataframe(start=None, end=None, username=None):
+    where, params = _where(start, end, username)
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(EVENTS_SQL.format(where=where), params)
+        return _frame(c.fetchall())
+
+def get_user_events(username, events):
+    codes = [int(event) for event in events]
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(USER_EVENTS_SQL.format(codes=', '.join('?' * len(codes))), [username] + codes)
+        return _frame(c.fetchall())
+
+def get_user_activity_summary(username, start=None, end=None):
+    where, params = _where(start, end, username)
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(SUMMARY_COUNTS_SQL.format(where=where), params)
+        total_actions, login_count = c.fetchone()
+        if not total_actions:
+            return None
+
+        c.execute(LAST_ACTION_SQL.format(where=where), params)
+        last_seen, last_action = c.fetchone()
+
+        c.execute(ACTION_BREAKDOWN_SQL.format(where=where), params)
+        breakdown = dict(c.fetchall())
+
+    return {
+        'total_actions': total_actions,
+        'login_count': login_count,
+        'last_action': last_action,
+        'last_seen': last_seen,
+        'actions_breakdown': breakdown
+    }
+
+def get_activity_statistics(start=None, end=None):
+    where, params = _where(start, end)
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(f"SELECT username, COUNT(*) AS n FROM activity_log{where} GROUP BY username ORDER BY n DESC, username", params)
+        per_user = c.fetchall()
+        if not per_user:
+            return None
+
+        c.execute(f"SELECT ts, username, action, event FROM activity_log{where} ORDER BY ts DESC, id DESC LIMIT 10", params)
+        recent = c.fetchall()[::-1]
+
+    return {
+        'total_logs': sum(count for _, count in per_user),
+        'unique_users': len(per_user),
+        'most_active_user': per_user[0][0],
+        'actions_per_user': dict(per_user),
+        'recent_activity': [dict(zip(LOG_COLUMNS, row[:3] + (EVENT_NAMES[row[3]],))) for row in recent]
+    }
+
+def get_recent_logs(limit):
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT ts, username, action, event FROM activity_log ORDER BY ts DESC, id DESC LIMIT ?", (limit,))
+        return _frame(c.fetchall()[::-1])
+
+def _user_plan(name, sql, **format_args):
+    # One user's rows over a time range, as the admin log viewer requests them
+    where, params = _where('0', '~', 'user')
+    return (name, sql.format(where=where, **format_args), params)
+
+# Planned by database.explain_dao_queries
+ACTIVITY_DAO_QUERIES = [
+    _user_plan("get_logs_dataframe", EVENTS_SQL),
+    ("get_user_events", USER_EVENTS_SQL.format(codes='?'), ('user', int(EventType.LOGIN))),
+    _user_plan("get_user_activity_summary", SUMMARY_COUNTS_SQL),
+    _user_plan("get_user_activity_summary/last", LAST_ACTION_SQL),
+    _user_plan("get_user_activity_summary/actions", ACTION_BREAKDOWN_SQL),
+]
+
+def import_text_log():
+    from modules.activity_logger import iter_log_events
+
+    imported = 0
+    batch = []
+    for event in iter_log_events():
+        batch.append(event)
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            append_events(batch)
+            imported += len(batch)
+            batch = []
+    append_events(batch)
+    return imported + len(batch)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import the text activity log into the SQLite activity store")
+    parser.parse_args(argv)
+
+    initialize_database()
+    count = import_text_log()
+    print(f"  ✓ Imported {count} events into the activity_log table")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,12 @@
-from modules.database import get_all_users, update_user_status, get_user_profile, get_all_feedback, mark_feedback_resolved, get_account_lock_requests, unlock_user_account
+from modules.database import get_user_by_id, update_user_status, mark_feedback_resolved, unlock_user_account
+from modules.database import get_users_page, get_feedback_page, get_lock_requests_page
+from modules.database import get_storage_report, set_storage_profile, STORAGE_PROFILES
+from modules.database import get_schema_version, migrate_database, explain_dao_queries
 from modules.activity_logger import view_logs, log_action, get_logs_dataframe, get_user_activity_summary, get_activity_statistics, display_logs_table
-import pandas as pd
-import numpy as np
+from modules.activity_logger import rotate_logs, load_manifest, rebuild_activity_statistics
+from modules.dashboard import get_dashboard_statistics, find_counter_drift, rebuild_dashboard_counters
+from modules.user_stats import find_user_stats_drift, rebuild_user_stats
+from modules.event_types import EventType
 
 ADMIN_USERNAME = "admin"
 ADMIN_PASSWORD = "admin123"
@@ -23,51 +28,98 @@ def admin_login():
     if username == ADMIN_USERNAME and password == ADMIN_PASSWORD:
         print("\n  ✓ Authentication successful")
         print(f"  Welcome, Administrator {username}")
-        log_action("Admin", "Logged in")
+        log_action("Admin", "Logged in", EventType.LOGIN)
         input("\n  Press Enter to continue...")
         admin_menu()
     else:
         print("\n  ✗ Invalid admin credentials")
         input("\n  Press Enter to continue...")
 
+FILTER_KEYS = {'status': 'status', 'user': 'username', 'username': 'username', 'since': 'since', 'until': 'until'}
+
+def ask_filters(allowed):
+    # "status=Pending user=ali since=2025-01-01" -> {'status': 'Pending', 'username': 'ali', 'since': '2025-01-01'}
+    hint = " ".join(f"{key}=..." for key in allowed)
+    text = input(f"  Filter ({hint}; Enter for none): ").strip()
+    filters = {}
+    for token in text.split():
+        key, sep, value = token.partition("=")
+        name = FILTER_KEYS.get(key.lower())
+        if sep and value and name in [FILTER_KEYS[k] for k in allowed]:
+            filters[name] = value
+    return filters
+
+def browse_pages(fetch_page, render_rows, prompt, select=True):
+    # Shows one page at a time. With select, returns an ID from the page on
+    # screen, or "0"/"" to cancel, and asks again on anything else; without,
+    # returns the first input that is not N/P navigation.
+    page = fetch_page(None, False)
+    changed = True
+    while True:
+        if changed:
+            render_rows(page['rows'])
+            nav = []
+            if page['has_prev']:
+                nav.append("[P] Previous page")
+            if page['has_next']:
+                nav.append("[N] Next page")
+            if nav:
+                print("  " + "   ".join(nav))
+        choice = input(prompt).strip()
+        changed = True
+        if choice.upper() == "N" and page['has_next']:
+            page = fetch_page(page['last'], False)
+        elif choice.upper() == "P" and page['has_prev']:
+            page = fetch_page(page['first'], True)
+        elif not select or choice in ("", "0") or choice in {str(row[0]) for row in page['rows']}:
+            return choice, page
+        else:
+            print("  ✗ Invalid choice - enter an ID shown on this page, or 0 to cancel")
+            changed = False
+
 def process_audit_requests():
     print_header("PROCESS AUDIT REQUESTS")
     
-    from modules.database import get_audit_requests, mark_audit_completed
+    from modules.database import get_audit_requests_page, mark_audit_completed, get_user_stats
     
-    requests = get_audit_requests()
+    filters = ask_filters(['user', 'since', 'until'])
     
-    if not requests:
-        print("  No pending audit requests.")
-        return
+    def fetch(cursor, backwards):
+        return get_audit_requests_page(cursor=cursor, backwards=backwards, **filters)
     
-    df = pd.DataFrame(requests, columns=['ID', 'Username', 'Timestamp', 'Status'])
-    
-    print_separator("-")
-    print(f"  {'ID':<6} {'USERNAME':<20} {'TIMESTAMP':<20} {'STATUS':<12}")
-    print_separator("-")
-    
-    for _, row in df.iterrows():
-        print(f"  {row['ID']:<6} {row['Username']:<20} {row['Timestamp']:<20} {row['Status']:<12}")
+    def render(rows):
+        print_separator("-")
+        print(f"  {'ID':<6} {'USERNAME':<20} {'TIMESTAMP':<20} {'STATUS':<12}")
+        print_separator("-")
+        print("\n".join(f"  {row[0]:<6} {row[1]:<20} {row[2]:<20} {row[3]:<12}" for row in rows))
+        print_separator("-")
     
-    print_separator("-")
+    if not fetch(None, False)['rows']:
+        print("  No pending audit requests.")
+        return
     
-    audit_id = input("\n  Enter Audit Request ID to process (or 0 to cancel): ").strip()
+    audit_id, page = browse_pages(fetch, render, "\n  Enter Audit Request ID to process (or 0 to cancel): ")
     
-    if audit_id == "0":
+    if audit_id in ("", "0"):
         return
     
-    username = df[df['ID'] == int(audit_id)]['Username'].values[0]
+    requests = {str(row[0]): (row[1], row[4]) for row in page['rows']}
+    username, user_id = requests[audit_id]
     
     summary = get_user_activity_summary(username)
     
     if summary:
+        stats = get_user_stats(user_id)
         print(f"\n  AUDIT REPORT FOR: {username}")
         print_separator("=")
         print(f"  Total Actions: {summary['total_actions']}")
         print(f"  Login Count: {summary['login_count']}")
         print(f"  Last Action: {summary['last_action']}")
         print(f"  Last Seen: {summary['last_seen']}")
+        print(f"  Passwords Stored: {stats['passwords']}")
+        print(f"  Feedback Submitted: {stats['feedback']} ({stats['feedback_pending']} pending)")
+        print(f"  Account Locks: {stats['lock_events']} ({stats['unlock_requests']} awaiting unlock)")
+        print(f"  Audits Requested: {stats['audit_requests']} ({stats['audits_completed']} completed)")
         print("\n  ACTIONS BREAKDOWN:")
         print_separator("-")
         
@@ -79,8 +131,8 @@ def process_audit_requests():
         mark_audit_completed(int(audit_id))
         
         from modules.activity_logger import log_action
-        log_action("Admin", f"Completed audit for {username} (Request ID: {audit_id})")
-        log_action(username, f"Account audit completed by Admin - Summary: {summary['total_actions']} total actions, {summary['login_count']} logins")
+        log_action("Admin", f"Completed audit for {username} (Request ID: {audit_id})", EventType.AUDIT_COMPLETED)
+        log_action(username, f"Account audit completed by Admin - Summary: {summary['total_actions']} total actions, {summary['login_count']} logins", EventType.AUDIT_COMPLETED)
         
         print("\n  ✓ Audit completed and logged for user")
     else:
@@ -92,64 +144,63 @@ def display_users_table(users_data):
         print("  No users found.")
         return
     
-    df = pd.DataFrame(users_data, columns=['ID', 'Username', 'Status', 'Name', 'Email'])
-    
     print_separator("-")
     print(f"  {'ID':<8} {'USERNAME':<20} {'STATUS':<15} {'NAME':<20} {'EMAIL':<30}")
     print_separator("-")
-    
-    for _, row in df.iterrows():
-        name = row['Name'] if row['Name'] else 'N/A'
-        email = row['Email'] if row['Email'] else 'N/A'
-        print(f"  {row['ID']:<8} {row['Username']:<20} {row['Status']:<15} {name:<20} {email:<30}")
-    
+    print("\n".join(f"  {u[0]:<8} {u[1]:<20} {u[2]:<15} {u[3] or 'N/A':<20} {u[4] or 'N/A':<30}" for u in users_data))
     print_separator("-")
-    print(f"\n  Total Users: {len(df)}")
 
 def view_all_users():
     print_header("ALL REGISTERED USERS")
-    users = get_all_users()
+    stats = get_dashboard_statistics()
     
-    if not users:
+    if not stats['total_users']:
         print("  No users in the system.")
         return
     
-    display_users_table(users)
+    filters = ask_filters(['status', 'user'])
     
-    df = pd.DataFrame(users, columns=['ID', 'Username', 'Status', 'Name', 'Email'])
-    status_counts = df['Status'].value_counts().to_dict()
+    def fetch(cursor, backwards):
+        return get_users_page(cursor=cursor, backwards=backwards, **filters)
     
+    browse_pages(fetch, display_users_table, "\n  Enter N/P to page, or press Enter to continue: ", select=False)
+    
+    print(f"\n  Total Users: {stats['total_users']}")
     print("\n  STATUS BREAKDOWN:")
     print_separator("-")
-    for status, count in status_counts.items():
+    for status, count in sorted(stats['status_breakdown'].items(), key=lambda item: -item[1]):
         print(f"  {status:<15}: {count}")
     print_separator("-")
+    print(f"\n  Total Passwords Stored: {stats['total_passwords']}")
+    print("\n  PASSWORDS PER USER:")
+    print_separator("-")
+    for bucket, count in stats['passwords_per_user'].items():
+        print(f"  {bucket:<15}: {count}")
+    print_separator("-")
 
 def approve_reject_users():
     print_header("APPROVE / REJECT USERS")
-    users = get_all_users()
-    pending = [u for u in users if u[2] == "Pending"]
     
-    if not pending:
-        print("  No pending users for approval.")
-        return
+    def fetch(cursor, backwards):
+        return get_users_page(status="Pending", cursor=cursor, backwards=backwards)
     
-    print("  PENDING USERS:")
-    print_separator("-")
-    
-    for u in pending:
-        print(f"  ID: {u[0]} | Username: {u[1]} | Status: {u[2]}")
-        profile = get_user_profile(u[0])
-        if profile:
-            print(f"    Name: {profile[0] or 'N/A'}")
-            print(f"    Email: {profile[1] or 'N/A'}")
-            print(f"    Purpose: {profile[2] or 'N/A'}")
-            print(f"    Organization: {profile[3] or 'N/A'}")
+    def render(rows):
+        print("  PENDING USERS:")
         print_separator("-")
+        rule = "-" * 100
+        print("\n".join(f"  ID: {u[0]} | Username: {u[1]} | Status: {u[2]}\n"
+                        f"    Name: {u[3] or 'N/A'}\n"
+                        f"    Email: {u[4] or 'N/A'}\n"
+                        f"    Purpose: {u[5] or 'N/A'}\n"
+                        f"    Organization: {u[6] or 'N/A'}\n{rule}" for u in rows))
+    
+    if not fetch(None, False)['rows']:
+        print("  No pending users for approval.")
+        return
     
-    uid = input("\n  Enter User ID to approve/reject (or 0 to cancel): ").strip()
+    uid, _ = browse_pages(fetch, render, "\n  Enter User ID to approve/reject (or 0 to cancel): ")
     
-    if uid == "0":
+    if uid in ("", "0"):
         return
     
     action = input("  [A] Approve / [R] Reject: ").strip().upper()
@@ -157,40 +208,41 @@ def approve_reject_users():
     if action == "A":
         update_user_status(int(uid), "Approved")
         print("\n  ✓ User approved successfully")
-        log_action("Admin", f"Approved user ID {uid}")
+        log_action("Admin", f"Approved user ID {uid}", EventType.USER_STATUS_CHANGED)
     elif action == "R":
         update_user_status(int(uid), "Rejected")
         print("\n  ✓ User rejected")
-        log_action("Admin", f"Rejected user ID {uid}")
+        log_action("Admin", f"Rejected user ID {uid}", EventType.USER_STATUS_CHANGED)
     else:
         print("\n  ✗ Invalid action")
 
 def suspend_unsuspend_users():
     print_header("SUSPEND / UNSUSPEND USERS")
-    users = get_all_users()
-    active = [u for u in users if u[2] in ["Approved", "Suspended"]]
     
-    if not active:
+    def fetch(cursor, backwards):
+        return get_users_page(status=("Approved", "Suspended"), cursor=cursor, backwards=backwards)
+    
+    def render(rows):
+        print("  ACTIVE USERS:")
+        print_separator("-")
+        print("\n".join(f"  {u[0]}. {u[1]:<25} → {u[2]}" for u in rows))
+        print_separator("-")
+    
+    if not fetch(None, False)['rows']:
         print("  No active users.")
         return
     
-    print("  ACTIVE USERS:")
-    print_separator("-")
-    for u in active:
-        print(f"  {u[0]}. {u[1]:<25} → {u[2]}")
-    print_separator("-")
-    
-    uid = input("\n  Enter User ID to toggle suspend (or 0 to cancel): ").strip()
+    uid, _ = browse_pages(fetch, render, "\n  Enter User ID to toggle suspend (or 0 to cancel): ")
     
-    if uid == "0":
+    if uid in ("", "0"):
         return
     
-    status = [u[2] for u in active if str(u[0]) == uid]
-    if status:
-        new_status = "Suspended" if status[0] == "Approved" else "Approved"
+    user = get_user_by_id(int(uid))
+    if user and user[3] in ("Approved", "Suspended"):
+        new_status = "Suspended" if user[3] == "Approved" else "Approved"
         update_user_status(int(uid), new_status)
         print(f"\n  ✓ User status changed to: {new_status}")
-        log_action("Admin", f"Changed user ID {uid} status to {new_status}")
+        log_action("Admin", f"Changed user ID {uid} status to {new_status}", EventType.USER_STATUS_CHANGED)
     else:
         print("\n  ✗ Invalid User ID")
 
@@ -208,10 +260,10 @@ def view_activity_logs():
     
     if choice == "1":
         print(display_logs_table())
-        log_action("Admin", "Viewed all activity logs")
+        log_action("Admin", "Viewed all activity logs", EventType.LOGS_VIEWED)
     elif choice == "2":
         print(display_logs_table(limit=20))
-        log_action("Admin", "Viewed recent activity logs")
+        log_action("Admin", "Viewed recent activity logs", EventType.LOGS_VIEWED)
     elif choice == "3":
         stats = get_activity_statistics()
         if stats:
@@ -225,9 +277,15 @@ def view_activity_logs():
             for user, count in stats['actions_per_user'].items():
                 print(f"  {user:<20}: {count} actions")
             print_separator("-")
+            if stats.get('actions_per_type'):
+                print("\n  ACTIONS PER TYPE:")
+                print_separator("-")
+                for action_type, count in sorted(stats['actions_per_type'].items(), key=lambda item: -item[1]):
+                    print(f"  {action_type:<20}: {count}")
+                print_separator("-")
         else:
             print("\n  No statistics available.")
-        log_action("Admin", "Viewed activity statistics")
+        log_action("Admin", "Viewed activity statistics", EventType.LOGS_VIEWED)
 
 def view_user_activity_summary():
     print_header("USER ACTIVITY SUMMARY")
@@ -252,69 +310,250 @@ def view_user_activity_summary():
         print(f"  {action:<50}: {count}")
     
     print_separator("-")
-    log_action("Admin", f"Viewed activity summary for {username}")
+    log_action("Admin", f"Viewed activity summary for {username}", EventType.LOGS_VIEWED)
 
 def view_feedback():
     print_header("USER FEEDBACK")
     
-    feedback_list = get_all_feedback()
-    
-    if not feedback_list:
+    status_counts = get_dashboard_statistics()['feedback_breakdown']
+    if not status_counts:
         print("  No feedback submitted yet.")
         return
     
-    df = pd.DataFrame(feedback_list, columns=['ID', 'Username', 'Feedback', 'Timestamp', 'Status'])
+    filters = ask_filters(['status', 'user', 'since', 'until'])
     
-    print_separator("-")
-    print(f"  {'ID':<6} {'USERNAME':<20} {'STATUS':<12} {'TIMESTAMP':<20}")
-    print_separator("-")
+    def fetch(cursor, backwards):
+        return get_feedback_page(cursor=cursor, backwards=backwards, **filters)
     
-    for _, row in df.iterrows():
-        print(f"  {row['ID']:<6} {row['Username']:<20} {row['Status']:<12} {row['Timestamp']:<20}")
-        print(f"  Feedback: {row['Feedback']}")
+    def render(rows):
         print_separator("-")
+        print(f"  {'ID':<6} {'USERNAME':<20} {'STATUS':<12} {'TIMESTAMP':<20}")
+        print_separator("-")
+        rule = "-" * 100
+        print("\n".join(f"  {row[0]:<6} {row[1]:<20} {row[4]:<12} {row[3]:<20}\n"
+                        f"  Feedback: {row[2]}\n{rule}" for row in rows))
+        print(f"\n  Total Feedback: {sum(status_counts.values())}")
+        print(f"  Pending: {status_counts.get('Pending', 0)}")
+        print(f"  Resolved: {status_counts.get('Resolved', 0)}")
     
-    print(f"\n  Total Feedback: {len(df)}")
-    print(f"  Pending: {len(df[df['Status'] == 'Pending'])}")
-    print(f"  Resolved: {len(df[df['Status'] == 'Resolved'])}")
-    
-    fid = input("\n  Enter Feedback ID to mark as resolved (or 0 to skip): ").strip()
+    fid, _ = browse_pages(fetch, render, "\n  Enter Feedback ID to mark as resolved (or 0 to skip): ")
     
-    if fid != "0":
+    if fid and fid != "0":
         mark_feedback_resolved(int(fid))
         print("\n  ✓ Feedback marked as resolved")
-        log_action("Admin", f"Resolved feedback ID {fid}")
+        log_action("Admin", f"Resolved feedback ID {fid}", EventType.FEEDBACK_RESOLVED)
 
 def view_unlock_requests():
     print_header("ACCOUNT UNLOCK REQUESTS")
     
-    requests = get_account_lock_requests()
+    filters = ask_filters(['user', 'since', 'until'])
+    
+    def fetch(cursor, backwards):
+        return get_lock_requests_page(cursor=cursor, backwards=backwards, **filters)
+    
+    def render(rows):
+        print_separator("-")
+        print(f"  {'ID':<6} {'USERNAME':<20} {'TIMESTAMP':<20}")
+        print_separator("-")
+        rule = "-" * 100
+        print("\n".join(f"  {row[0]:<6} {row[1]:<20} {row[3]:<20}\n  Reason: {row[2]}\n{rule}" for row in rows))
     
-    if not requests:
+    if not fetch(None, False)['rows']:
         print("  No unlock requests pending.")
         return
     
-    df = pd.DataFrame(requests, columns=['ID', 'Username', 'Reason', 'Timestamp'])
+    uid, _ = browse_pages(fetch, render, "\n  Enter Request ID to unlock account (or 0 to cancel): ")
     
+    if uid and uid != "0":
+        unlock_user_account(int(uid))
+        print("\n  ✓ Account unlocked successfully")
+        log_action("Admin", f"Unlocked account for request ID {uid}", EventType.ACCOUNT_UNLOCKED)
+
+def view_storage_profile():
+    report = get_storage_report()
+    
+    print("  STORAGE PROFILE:")
     print_separator("-")
-    print(f"  {'ID':<6} {'USERNAME':<20} {'TIMESTAMP':<20}")
+    print(f"  {'Active Profile':<20}: {report['profile']}")
+    print(f"  {'Journal Mode':<20}: {report['journal_mode']}")
+    print(f"  {'Synchronous':<20}: {report['synchronous']}")
+    print(f"  {'Cache Size':<20}: {report['cache_size']}")
+    print(f"  {'MMAP Size':<20}: {report['mmap_size']} bytes")
+    print(f"  {'Temp Store':<20}: {report['temp_store']}")
+    print(f"  {'Busy Timeout':<20}: {report['busy_timeout']} ms")
+    print(f"  {'Database Size':<20}: {report['page_size'] * report['page_count']} bytes "
+          f"({report['freelist_count']} free pages)")
     print_separator("-")
     
-    for _, row in df.iterrows():
-        print(f"  {row['ID']:<6} {row['Username']:<20} {row['Timestamp']:<20}")
-        print(f"  Reason: {row['Reason']}")
+    profiles = list(STORAGE_PROFILES)
+    print(f"\n  Available profiles: {', '.join(profiles)}")
+    profile = input("  Switch profile for this session (or Enter to keep): ").strip().lower()
+    
+    if not profile:
+        return
+    
+    if profile in profiles:
+        set_storage_profile(profile)
+        print(f"\n  ✓ Storage profile set to: {profile}")
+        log_action("Admin", f"Changed storage profile to {profile}", EventType.MAINTENANCE)
+    else:
+        print("\n  ✗ Unknown profile")
+
+def view_query_plans():
+    applied = migrate_database()
+    if applied:
+        print(f"  ✓ Applied schema migrations: {', '.join(str(v) for v in applied)}")
+    print(f"  Schema Version: {get_schema_version()}")
+    print()
+    
+    report = explain_dao_queries()
+    
+    print("  QUERY PLANS:")
+    print_separator("-")
+    for entry in report:
+        if entry['full_scan']:
+            flag = "⚠ FULL SCAN"
+        elif not entry['plan']:
+            flag = "✓ no lookup"
+        elif any("USING" in step for step in entry['plan']):
+            flag = "✓ indexed"
+        else:
+            flag = "✓ small table"
+        print(f"  {entry['query']:<36} {flag}")
+        for step in entry['plan']:
+            print(f"      {step}")
+    print_separator("-")
+    
+    scans = [entry['query'] for entry in report if entry['full_scan']]
+    print(f"\n  Queries: {len(report)} | Full table scans: {len(scans)}")
+    log_action("Admin", "Viewed query plans", EventType.MAINTENANCE)
+
+def rotate_encryption_key():
+    from modules.key_rotation import get_active_rotation, get_rotation_history, run_key_rotation, count_stale_rows
+    from modules.security_utils import is_keyring_writable
+    
+    history = get_rotation_history()
+    if history:
+        print("  ROTATION HISTORY:")
+        print_separator("-")
+        print(f"  {'ID':<6} {'KEY':<6} {'ROWS':<10} {'STATUS':<12} {'STARTED':<20} {'COMPLETED':<20}")
+        print_separator("-")
+        for job in history:
+            print(f"  {job[0]:<6} {job[1]:<6} {job[2]:<10} {job[3]:<12} {job[4]:<20} {job[5] or 'N/A':<20}")
         print_separator("-")
     
-    uid = input("\n  Enter Request ID to unlock account (or 0 to cancel): ").strip()
+    active = get_active_rotation()
+    if active:
+        print(f"\n  ⚠ Rotation {active[0]} to key {active[1]} is incomplete (checkpoint: row {active[2]})")
+        confirm = input("  Resume rotation? [Y/N]: ").strip().upper()
+    elif not is_keyring_writable():
+        print("\n  ⚠ Encryption keys come from a read-only source (environment or file descriptor).")
+        print("  Add the new key to that source and restart to rotate.")
+        return
+    else:
+        print(f"\n  Rows not on the current primary key: {count_stale_rows()}")
+        confirm = input("  Generate a new key and re-encrypt all stored passwords? [Y/N]: ").strip().upper()
     
-    if uid != "0":
-        unlock_user_account(int(uid))
-        print("\n  ✓ Account unlocked successfully")
-        log_action("Admin", f"Unlocked account for request ID {uid}")
+    if confirm != "Y":
+        return
+    
+    def report(last_row_id, rows_rotated):
+        print(f"\r  Re-encrypted {rows_rotated} rows (checkpoint: row {last_row_id})", end="", flush=True)
+    
+    result = run_key_rotation(progress=report)
+    print(f"\n\n  ✓ Rotation complete: {result['rows_rotated']} rows now use key {result['target_key_id']}")
+    log_action("Admin", f"Rotated encryption key to key ID {result['target_key_id']}", EventType.MAINTENANCE)
+
+def rotate_activity_log():
+    segments = load_manifest()['segments']
+    
+    if segments:
+        print("  LOG SEGMENTS:")
+        print_separator("-")
+        print(f"  {'#':<5} {'FIRST EVENT':<20} {'LAST EVENT':<20} {'ROWS':<10} {'USERS':<6}")
+        print_separator("-")
+        for entry in segments:
+            print(f"  {entry['number']:<5} {entry['first_timestamp'] or 'N/A':<20} {entry['last_timestamp'] or 'N/A':<20} "
+                  f"{entry['rows']:<10} {len(entry['user_counts']):<6}")
+        print_separator("-")
+    else:
+        print("  No rotated log segments yet.")
+    
+    confirm = input("\n  Rotate the active activity log now? [Y/N]: ").strip().upper()
+    if confirm != "Y":
+        return
+    
+    if rotate_logs(force=True):
+        print("\n  ✓ Activity log rotated into a compressed segment")
+        log_action("Admin", "Rotated activity log", EventType.MAINTENANCE)
+    else:
+        print("\n  Nothing to rotate")
+
+def rebuild_activity_stats():
+    print("  Activity statistics are kept as running totals and saved to a snapshot.")
+    confirm = input("\n  Rebuild them from the raw activity log now? [Y/N]: ").strip().upper()
+    if confirm != "Y":
+        return
+    
+    total = rebuild_activity_statistics()
+    print(f"\n  ✓ Rebuilt statistics from {total} log entries")
+    log_action("Admin", "Rebuilt activity statistics", EventType.MAINTENANCE)
+
+def rebuild_summary_counters():
+    drift = [(name, stored, actual) for name, (stored, actual) in find_counter_drift().items()]
+    drift += [(f"user {user_id}: {column}", stored, actual) for user_id, column, stored, actual in find_user_stats_drift()]
+    if not drift:
+        print("  ✓ Dashboard counters and per-user stats match the base tables")
+        return
+    
+    print(f"  {'COUNTER':<40} {'STORED':>10} {'ACTUAL':>10}")
+    print_separator("-")
+    print("\n".join(f"  {name:<40} {stored:>10} {actual:>10}" for name, stored, actual in drift))
+    confirm = input("\n  Rebuild summary counters from the base tables now? [Y/N]: ").strip().upper()
+    if confirm != "Y":
+        return
+    
+    rebuild_dashboard_counters()
+    rebuild_user_stats()
+    print("\n  ✓ Rebuilt dashboard counters and per-user stats")
+    log_action("Admin", "Rebuilt summary counters", EventType.MAINTENANCE)
+
+def database_maintenance():
+    print_header("DATABASE MAINTENANCE")
+    
+    print("  [1] View / Change Storage Profile")
+    print("  [2] Schema Version & Query Plans")
+    print("  [3] Rotate Encryption Key")
+    print("  [4] Rotate Activity Log")
+    print("  [5] Rebuild Activity Statistics")
+    print("  [6] Check / Rebuild Summary Counters")
+    print("  [7] Back")
+    print()
+    print_separator("-")
+    
+    choice = input("\n  Choose: ").strip()
+    
+    if choice == "1":
+        view_storage_profile()
+    elif choice == "2":
+        view_query_plans()
+    elif choice == "3":
+        rotate_encryption_key()
+    elif choice == "4":
+        rotate_activity_log()
+    elif choice == "5":
+        rebuild_activity_stats()
+    elif choice == "6":
+        rebuild_summary_counters()
 
 def admin_menu():
     while True:
         print_header("ADMIN PORTAL")
+        stats = get_dashboard_statistics()
+        print(f"  Users: {stats['total_users']} ({stats['status_breakdown'].get('Pending', 0)} pending approval)"
+              f" | Feedback: {stats['pending_feedback']} pending | Unlock requests: {stats['unlock_requests']}"
+              f" | Audits: {stats['pending_audits']} pending")
+        print()
         print("  [1]  View All Users")
         print("  [2]  Approve / Reject Users")
         print("  [3]  Suspend / Unsuspend Users")
@@ -323,7 +562,8 @@ def admin_menu():
         print("  [6]  View User Feedback")
         print("  [7]  View Unlock Requests")
         print("  [8]  Process Audit Requests")
-        print("  [9]  Logout")
+        print("  [9]  Database Maintenance")
+        print("  [10] Logout")
         print()
         print_separator("-")
         
@@ -346,7 +586,9 @@ def admin_menu():
         elif choice == "8":
             process_audit_requests()
         elif choice == "9":
-            log_action("Admin", "Logged out")
+            database_maintenance()
+        elif choice == "10":
+            log_action("Admin", "Logged out", EventType.LOGOUT)
             print("\n  ✓ Logged out successfully")
             input("\n  Press Enter to continue...")
             break
@@ -0,0 +1,180 @@
+import os
+import sys
+import struct
+import calendar
+import datetime
+import argparse
+import threading
+import numpy as np
+from modules.event_types import EVENT_NAMES, encode_action, decode_action
+from modules.file_lock import file_lock
+
+BINARY_LOG_FILE = os.environ.get("TOOLKIT_BINARY_LOG", "activity.blog")
+CONVERT_BATCH_SIZE = 100000
+
+# Event file: fixed-width little-endian records, loaded with np.fromfile.
+# Usernames and actions are dictionary-encoded into side files of
+# length-prefixed UTF-8 strings, where a string's ID is its position.
+# Action entries carry their event code as "<action>\t#<code>".
+EVENT_DTYPE = np.dtype([('ts', '<i8'), ('user', '<u4'), ('action', '<u4')])
+LENGTH = struct.Struct("<I")
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def to_epoch(moment):
+    # Wall-clock time stored as if it were UTC, so it round-trips without a timezone
+    return calendar.timegm(moment.timetuple())
+
+def parse_timestamp(text):
+    return to_epoch(datetime.datetime.strptime(text, TIMESTAMP_FORMAT))
+
+class StringDictionary:
+    def __init__(self, path):
+        self.path = path
+        self.values = []
+        self.index = {}
+        self._size = 0
+        self.refresh()
+
+    def refresh(self):
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            size = 0
+        if size < self._size:
+            self.values, self.index, self._size = [], {}, 0
+        if size == self._size:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._size)
+            data = f.read(size - self._size)
+        pos = 0
+        while pos + LENGTH.size <= len(data):
+            (length,) = LENGTH.unpack_from(data, pos)
+            if pos + LENGTH.size + length > len(data):
+                break
+            value = data[pos + LENGTH.size:pos + LENGTH.size + length].decode("utf-8", errors="replace")
+            self.index.setdefault(value, len(self.values))
+            self.values.append(value)
+            pos += LENGTH.size + length
+        self._size += pos
+
+    def intern_many(self, values):
+        # IDs are positions in the file, so other processes' appends are read
+        # and new entries written under one lock, or two could claim the same ID
+        with file_lock(self.path + ".lock"):
+            self.refresh()
+            ids = []
+            pending = bytearray()
+            for value in values:
+                value_id = self.index.get(value)
+                if value_id is None:
+                    value_id = len(self.values)
+                    self.index[value] = value_id
+                    self.values.append(value)
+                    encoded = value.encode("utf-8")
+                    pending += LENGTH.pack(len(encoded)) + encoded
+                ids.append(value_id)
+            if pending:
+                with open(self.path, "ab") as f:
+                    # Drop a partial entry left by a writer that died mid-append
+                    if f.tell() != self._size:
+                        f.truncate(self._size)
+                    f.write(pending)
+                self._size += len(pending)
+            return ids
+
+class BinaryLog:
+    def __init__(self, path=None):
+        self.path = path or BINARY_LOG_FILE
+        self.users = StringDictionary(self.path + ".users")
+        self.actions = StringDictionary(self.path + ".actions")
+        self._lock = threading.Lock()
+
+    def append(self, events):
+        # events: iterable of (datetime, username, action, event)
+        events = list(events)
+        if not events:
+            return
+        with self._lock:
+            # Dictionary entries are written before the events that use them
+            user_ids = self.users.intern_many([e[1] for e in events])
+            action_ids = self.actions.intern_many([encode_action(e[2], e[3]) for e in events])
+            records = np.empty(len(events), dtype=EVENT_DTYPE)
+            records['ts'] = [to_epoch(e[0]) for e in events]
+            records['user'] = user_ids
+            records['action'] = action_ids
+            with open(self.path, "ab") as f:
+                f.write(records.tobytes())
+
+    def read_events(self, last=None):
+        try:
+            count = os.path.getsize(self.path) // EVENT_DTYPE.itemsize
+        except FileNotFoundError:
+            return np.empty(0, dtype=EVENT_DTYPE)
+        skip = max(count - last, 0) if last is not None else 0
+        with open(self.path, "rb") as f:
+            f.seek(skip * EVENT_DTYPE.itemsize)
+            return np.fromfile(f, dtype=EVENT_DTYPE, count=count - skip)
+
+    def to_dataframe(self, events):
+        import pandas as pd
+
+        self.users.refresh()
+        self.actions.refresh()
+        if not len(events):
+            return pd.DataFrame(columns=['Timestamp', 'Username', 'Action', 'Event'])
+        stamps = np.datetime_as_string(events['ts'].astype('datetime64[s]'))
+        # "YYYY-MM-DDTHH:MM:SS" -> "YYYY-MM-DD HH:MM:SS", in place on the character buffer
+        stamps.view('U1').reshape(len(stamps), -1)[:, 10] = ' '
+        # Decode each dictionary entry once, then map event rows through lookup arrays
+        names, action_codes, event_codes = {}, [], []
+        for value in self.actions.values:
+            action, event = decode_action(value)
+            action_codes.append(names.setdefault(action, len(names)))
+            event_codes.append(int(event))
+        action_ids = events['action'].astype(np.int64)
+        return pd.DataFrame({
+            'Timestamp': stamps.astype(object),
+            'Username': pd.Categorical.from_codes(events['user'].astype(np.int64), self.users.values),
+            'Action': pd.Categorical.from_codes(np.asarray(action_codes, dtype=np.int64)[action_ids], list(names)),
+            'Event': pd.Categorical.from_codes(np.asarray(event_codes, dtype=np.int8)[action_ids], EVENT_NAMES),
+        })
+
+    def dataframe(self, start=None, end=None, username=None):
+        events = self.read_events()
+        mask = np.ones(len(events), dtype=bool)
+        if start:
+            mask &= events['ts'] >= parse_timestamp(start)
+        if end:
+            mask &= events['ts'] <= parse_timestamp(end)
+        if username is not None:
+            self.users.refresh()
+            user_id = self.users.index.get(username)
+            mask &= (events['user'] == user_id) if user_id is not None else False
+        return self.to_dataframe(events[mask] if not mask.all() else events)
+
+def convert_text_log(output_path=None):
+    from modules.activity_logger import iter_log_events
+
+    log = BinaryLog(output_path)
+    converted = 0
+    batch = []
+    for event in iter_log_events():
+        batch.append(event)
+        if len(batch) >= CONVERT_BATCH_SIZE:
+            log.append(batch)
+            converted += len(batch)
+            batch = []
+    log.append(batch)
+    return converted + len(batch)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert the text activity log to the binary format")
+    parser.add_argument("output", nargs="?", default=BINARY_LOG_FILE)
+    args = parser.parse_args(argv)
+
+    count = convert_text_log(args.output)
+    print(f"  ✓ Converted {count} events into {args.output}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+import os
+import sys
+import math
+import mmap
+import heapq
+import struct
+import hashlib
+import tempfile
+import argparse
+import threading
+
+BREACH_CORPUS_FILE = os.environ.get("TOOLKIT_BREACH_CORPUS", "breach_corpus.bin")
+BUILD_RUN_SIZE = 5000000
+BUILD_BLOCK_SIZE = 65536
+DEFAULT_FALSE_POSITIVE_RATE = 0.001
+
+# Corpus file layout:
+#   header  | magic, algorithm, record size, record count, bloom bits, bloom hashes, offsets
+#   records | fixed-width binary digests, sorted ascending and de-duplicated
+#   bloom   | bit array probed before the binary search
+MAGIC = b"PSTBRCH1"
+HEADER = struct.Struct("<8s16sIQQIQQ")
+ALGORITHMS = {'sha1': 20, 'ntlm': 16}
+
+def password_digest(password, algorithm='sha1'):
+    if algorithm == 'sha1':
+        return hashlib.sha1(password.encode()).digest()
+    if algorithm == 'ntlm':
+        # MD4 is only available when the local OpenSSL still ships legacy digests
+        return hashlib.new('md4', password.encode('utf-16-le')).digest()
+    raise ValueError(f"Unsupported corpus algorithm: {algorithm}")
+
+def _bloom_size(count, false_positive_rate):
+    bits = max(8, math.ceil(-count * math.log(false_positive_rate) / (math.log(2) ** 2)))
+    hashes = max(1, round(bits / max(count, 1) * math.log(2)))
+    return bits, hashes
+
+def _bloom_positions(digest, bits, hashes):
+    # Digests are already uniformly distributed, so two 64-bit slices of the
+    # digest drive double hashing directly.
+    h1, h2 = struct.unpack_from("<QQ", digest)
+    return [((h1 + i * h2) & 0xFFFFFFFFFFFFFFFF) % bits for i in range(hashes)]
+
+class BreachCorpus:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, algorithm, self.record_size, self.count, self.bloom_bits,
+         self.bloom_hashes, self.records_offset, self.bloom_offset) = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a breach corpus file: {path}")
+        self.algorithm = algorithm.rstrip(b"\0").decode()
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def _bloom_contains(self, digest):
+        data = self._map
+        base = self.bloom_offset
+        for pos in _bloom_positions(digest, self.bloom_bits, self.bloom_hashes):
+            if not data[base + (pos >> 3)] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def contains_digest(self, digest):
+        if not self._bloom_contains(digest):
+            return False
+        lo, hi = 0, self.count
+        size = self.record_size
+        base = self.records_offset
+        data = self._map
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = base + mid * size
+            record = data[start:start + size]
+            if record < digest:
+                lo = mid + 1
+            elif record > digest:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def contains_password(self, password):
+        return self.contains_digest(password_digest(password, self.algorithm))
+
+_corpus = None
+_corpus_lock = threading.Lock()
+
+def get_breach_corpus():
+    global _corpus
+    with _corpus_lock:
+        if _corpus is None and os.path.exists(BREACH_CORPUS_FILE):
+            _corpus = BreachCorpus(BREACH_CORPUS_FILE)
+        return _corpus
+
+def close_breach_corpus():
+    global _corpus
+    with _corpus_lock:
+        if _corpus is not None:
+            _corpus.close()
+            _corpus = None
+
+def is_password_breached(password):
+    corpus = get_breach_corpus()
+    if corpus is None or not password:
+        return False
+    try:
+        return corpus.contains_password(password)
+    except ValueError:
+        return False
+
+def _read_digests(source_path, record_size):
+    # Accepts plain hex digests or HIBP-style "HEX:count" lines
+    with open(source_path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            digest = bytes.fromhex(line.split(":", 1)[0])
+            if len(digest) != record_size:
+                raise ValueError(f"Unexpected digest length in line: {line[:60]}")
+            yield digest
+
+def _write_sorted_runs(source_path, record_size, run_size, temp_dir):
+    import numpy as np
+
+    runs = []
+    buffer = bytearray()
+
+    def flush():
+        records = np.unique(np.frombuffer(bytes(buffer), dtype=f"S{record_size}"))
+        run_path = os.path.join(temp_dir, f"run_{len(runs):05d}.bin")
+        # tobytes() keeps the full fixed-width records, including trailing zero bytes
+        with open(run_path, "wb") as f:
+            f.write(records.tobytes())
+        runs.append(run_path)
+        buffer.clear()
+
+    for digest in _read_digests(source_path, record_size):
+        buffer += digest
+        if len(buffer) >= run_size * record_size:
+            flush()
+    if buffer or not runs:
+        flush()
+    return runs
+
+def _iter_run(path, record_size):
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(BUILD_BLOCK_SIZE * record_size)
+            if not block:
+                break
+            for i in range(0, len(block), record_size):
+                yield block[i:i + record_size]
+
+def _merge_runs(runs, record_size, out):
+    count = 0
+    previous = None
+    pending = bytearray()
+    for record in heapq.merge(*(_iter_run(path, record_size) for path in runs)):
+        if record == previous:
+            continue
+        pending += record
+        previous = record
+        count += 1
+        if len(pending) >= BUILD_BLOCK_SIZE * record_size:
+            out.write(pending)
+            pending.clear()
+    out.write(pending)
+    return count
+
+def _copy_run(path, out):
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(BUILD_BLOCK_SIZE * 64)
+            if not block:
+                break
+            out.write(block)
+    return os.path.getsize(path)
+
+def _build_bloom(out_path, records_offset, count, record_size, bloom_offset, bits, hashes):
+    import numpy as np
+
+    records = np.memmap(out_path, dtype=np.uint8, mode="r", offset=records_offset, shape=(count, record_size))
+    bloom = np.memmap(out_path, dtype=np.uint8, mode="r+", offset=bloom_offset, shape=((bits + 7) // 8,))
+    for start in range(0, count, BUILD_RUN_SIZE):
+        chunk = np.ascontiguousarray(records[start:start + BUILD_RUN_SIZE, :16])
+        halves = chunk.view("<u8")
+        h1, h2 = halves[:, 0], halves[:, 1]
+        for i in range(hashes):
+            # uint64 wrap-around matches the masking in _bloom_positions()
+            positions = (h1 + np.uint64(i) * h2) % np.uint64(bits)
+            np.bitwise_or.at(bloom, (positions >> np.uint64(3)).astype(np.int64),
+                             (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8)))
+    bloom.flush()
+    del records, bloom
+
+def build_corpus(source_path, output_path=None, algorithm='sha1',
+                 false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE, run_size=BUILD_RUN_SIZE):
+    output_path = output_path or BREACH_CORPUS_FILE
+    record_size = ALGORITHMS[algorithm]
+    records_offset = HEADER.size
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output_path))) as temp_dir:
+        runs = _write_sorted_runs(source_path, record_size, run_size, temp_dir)
+        with open(output_path, "wb") as out:
+            out.write(b"\0" * HEADER.size)
+            if len(runs) == 1:
+                count = _copy_run(runs[0], out) // record_size
+            else:
+                count = _merge_runs(runs, record_size, out)
+
+    bits, hashes = _bloom_size(count, false_positive_rate)
+    bloom_offset = records_offset + count * record_size
+    with open(output_path, "r+b") as out:
+        out.seek(bloom_offset)
+        out.truncate(bloom_offset + (bits + 7) // 8)
+        out.seek(0)
+        out.write(HEADER.pack(MAGIC, algorithm.encode(), record_size, count, bits, hashes,
+                              records_offset, bloom_offset))
+    if count:
+        _build_bloom(output_path, records_offset, count, record_size, bloom_offset, bits, hashes)
+
+    if os.path.abspath(output_path) == os.path.abspath(BREACH_CORPUS_FILE):
+        close_breach_corpus()
+    return {'records': count, 'bloom_bits': bits, 'bloom_hashes': hashes}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a breached-password corpus from a hash list")
+    parser.add_argument("source", help="text file with one hex digest (or HASH:count) per line")
+    parser.add_argument("output", nargs="?", default=BREACH_CORPUS_FILE)
+    parser.add_argument("--algorithm", choices=sorted(ALGORITHMS), default="sha1")
+    parser.add_argument("--fp-rate", type=float, default=DEFAULT_FALSE_POSITIVE_RATE)
+    parser.add_argument("--run-size", type=int, default=BUILD_RUN_SIZE)
+    args = parser.parse_args(argv)
+
+    result = build_corpus(args.source, args.output, args.algorithm, args.fp_rate, args.run_size)
+    print(f"  ✓ Wrote {result['records']} hashes to {args.output} "
+          f"(bloom: {result['bloom_bits']} bits, {result['bloom_hashes']} hashes)")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+import os
+from modules.database import get_connection, COUNTED_TABLES, PASSWORD_BUCKETS, DASHBOARD_COUNTER_SQL
+
+# "counters" reads the trigger-maintained dashboard_counters table (one small
+# table scan); "live" aggregates the base tables, still in one statement.
+DASHBOARD_SOURCES = ('counters', 'live')
+DASHBOARD_SOURCE = os.environ.get("TOOLKIT_DASHBOARD_SOURCE", "counters")
+
+DASHBOARD_QUERIES = {
+    'counters': "SELECT name, value FROM dashboard_counters",
+    'live': DASHBOARD_COUNTER_SQL,
+}
+
+# Planned by database.explain_dao_queries; the live source aggregates every base table by design
+DASHBOARD_DAO_QUERIES = [("get_dashboard_statistics", DASHBOARD_QUERIES['counters'], ())]
+
+def _read_counters(source=None):
+    source = source or DASHBOARD_SOURCE
+    if source not in DASHBOARD_SOURCES:
+        raise ValueError(f"Unknown dashboard source: {source}")
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(DASHBOARD_QUERIES[source])
+        return {name: value for name, value in c.fetchall() if value}
+
+def get_dashboard_statistics(source=None):
+    counters = _read_counters(source)
+    # "<table>:<status>" -> {table: {status: count}}
+    by_status = {table: {} for table in COUNTED_TABLES}
+    for name, value in counters.items():
+        table, sep, status = name.partition(":")
+        if sep and table in by_status:
+            by_status[table][status] = value
+
+    users = by_status['users']
+    return {
+        'total_users': sum(users.values()),
+        'status_breakdown': users,
+        'total_passwords': counters.get('passwords', 0),
+        'passwords_per_user': {label: counters.get(f"passwords_per_user:{label}", 0) for _, label in PASSWORD_BUCKETS},
+        'feedback_breakdown': by_status['feedback'],
+        'pending_feedback': by_status['feedback'].get('Pending', 0),
+        'pending_audits': by_status['audit_requests'].get('Pending', 0),
+        'unlock_requests': by_status['account_locks'].get('Unlock Requested', 0),
+        'locked_accounts': users.get('Locked', 0),
+    }
+
+def find_counter_drift():
+    stored = _read_counters('counters')
+    live = _read_counters('live')
+    return {name: (stored.get(name, 0), live.get(name, 0))
+            for name in sorted(stored.keys() | live.keys()) if stored.get(name, 0) != live.get(name, 0)}
+
+def rebuild_dashboard_counters():
+    with get_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM dashboard_counters")
+        conn.execute(f"INSERT INTO dashboard_counters (name, value) {DASHBOARD_COUNTER_SQL}")
+        return conn.execute("SELECT COUNT(*) FROM dashboard_counters").fetchone()[0]
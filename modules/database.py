@@ -1,157 +1,579 @@
+import os
 import sqlite3
-import pandas as pd
-import numpy as np
-from modules.security_utils import hash_password, encrypt_password, decrypt_password
+import queue
+import threading
+from contextlib import contextmanager
+from modules.security_utils import (hash_password, verify_password, needs_rehash, encrypt_password_with_key_id,
+                                    decrypt_password, decrypt_many, encrypt_many, get_primary_key_id)
 
 DB_NAME = "toolkit.db"
+POOL_SIZE = 5
+POOL_TIMEOUT = 30
+PAGE_SIZE = 20
+
+STORAGE_PROFILES = {
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -8000,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 10000,
+    },
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -32000,
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    'throughput': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -128000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 2000,
+    },
+}
+STORAGE_PROFILE = os.environ.get("TOOLKIT_STORAGE_PROFILE", "balanced")
+SYNCHRONOUS_MODES = {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'}
+TEMP_STORE_MODES = {0: 'DEFAULT', 1: 'FILE', 2: 'MEMORY'}
+
+def apply_storage_profile(conn, profile=None):
+    settings = STORAGE_PROFILES[profile or STORAGE_PROFILE]
+    # busy_timeout first so a locked database doesn't fail the journal switch
+    conn.execute(f"PRAGMA busy_timeout={int(settings['busy_timeout'])}")
+    conn.execute(f"PRAGMA journal_mode={settings['journal_mode']}")
+    conn.execute(f"PRAGMA synchronous={settings['synchronous']}")
+    conn.execute(f"PRAGMA cache_size={int(settings['cache_size'])}")
+    conn.execute(f"PRAGMA mmap_size={int(settings['mmap_size'])}")
+    conn.execute(f"PRAGMA temp_store={settings['temp_store']}")
+
+def set_storage_profile(profile):
+    global STORAGE_PROFILE
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown storage profile: {profile}")
+    STORAGE_PROFILE = profile
+    # Pooled connections carry the old pragmas; reopen them lazily
+    close_pool()
+
+class ConnectionPool:
+    def __init__(self, database, size=POOL_SIZE):
+        self.database = database
+        self.size = size
+        self.closed = False
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.database, check_same_thread=False)
+        apply_storage_profile(conn)
+        return conn
+
+    def acquire(self, timeout=POOL_TIMEOUT):
+        if self.closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                conn = self._connect()
+                self._opened += 1
+                return conn
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(f"No database connection available after {timeout}s")
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        if self.closed:
+            self._discard(conn)
+        else:
+            self._idle.put(conn)
+
+    def _discard(self, conn):
+        conn.close()
+        with self._lock:
+            self._opened -= 1
+
+    def close(self):
+        self.closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.closed:
+            _pool = ConnectionPool(DB_NAME, POOL_SIZE)
+        return _pool
+
+def configure_pool(size=POOL_SIZE):
+    global POOL_SIZE
+    POOL_SIZE = size
+    close_pool()
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+@contextmanager
+def get_connection():
+    # Borrow a pooled connection for one unit of work: commit on success,
+    # roll back on error, and hand the connection back either way.
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        pool.release(conn)
 
 def initialize_database():
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE,
-                    password TEXT,
-                    status TEXT DEFAULT 'Pending')''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS user_profiles (
-                    user_id INTEGER PRIMARY KEY,
-                    name TEXT,
-                    email TEXT,
-                    purpose TEXT,
-                    organization TEXT,
-                    FOREIGN KEY(user_id) REFERENCES users(id))''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS passwords (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER,
-                    label TEXT,
-                    password TEXT,
-                    FOREIGN KEY(user_id) REFERENCES users(id))''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS feedback (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER,
-                    username TEXT,
-                    feedback TEXT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    status TEXT DEFAULT 'Pending',
-                    FOREIGN KEY(user_id) REFERENCES users(id))''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS account_locks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER,
-                    username TEXT,
-                    reason TEXT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    status TEXT DEFAULT 'Locked',
-                    FOREIGN KEY(user_id) REFERENCES users(id))''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS audit_requests (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER,
-                    username TEXT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    status TEXT DEFAULT 'Pending',
-                    FOREIGN KEY(user_id) REFERENCES users(id))''')
+    with get_connection() as conn:
+        c = conn.cursor()
+        
+        c.execute('''CREATE TABLE IF NOT EXISTS users (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        username TEXT UNIQUE,
+                        password TEXT,
+                        status TEXT DEFAULT 'Pending')''')
+        
+        c.execute('''CREATE TABLE IF NOT EXISTS user_profiles (
+                        user_id INTEGER PRIMARY KEY,
+                        name TEXT,
+                        email TEXT,
+                        purpose TEXT,
+                        organization TEXT,
+                        FOREIGN KEY(user_id) REFERENCES users(id))''')
+        
+        c.execute('''CREATE TABLE IF NOT EXISTS passwords (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        user_id INTEGER,
+                        label TEXT,
+                        password TEXT,
+                        FOREIGN KEY(user_id) REFERENCES users(id))''')
+        
+        c.execute('''CREATE TABLE IF NOT EXISTS feedback (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        user_id INTEGER,
+                        username TEXT,
+                        feedback TEXT,
+                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        status TEXT DEFAULT 'Pending',
+                        FOREIGN KEY(user_id) REFERENCES users(id))''')
+        
+        c.execute('''CREATE TABLE IF NOT EXISTS account_locks (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        user_id INTEGER,
+                        username TEXT,
+                        reason TEXT,
+                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        status TEXT DEFAULT 'Locked',
+                        FOREIGN KEY(user_id) REFERENCES users(id))''')
+        
+        c.execute('''CREATE TABLE IF NOT EXISTS audit_requests (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        user_id INTEGER,
+                        username TEXT,
+                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        status TEXT DEFAULT 'Pending',
+                        FOREIGN KEY(user_id) REFERENCES users(id))''')
+
+    migrate_database()
+
+# Tables whose rows are counted per status in dashboard_counters ("<table>:<status>")
+COUNTED_TABLES = ('users', 'feedback', 'account_locks', 'audit_requests')
+
+def _counter_triggers(table):
+    key = "'" + table + ":' || COALESCE({row}.status, '')"
+    increment = (f"INSERT INTO dashboard_counters (name, value) VALUES ({key.format(row='NEW')}, 1) "
+                 f"ON CONFLICT(name) DO UPDATE SET value = value + 1;")
+    decrement = f"UPDATE dashboard_counters SET value = value - 1 WHERE name = {key.format(row='OLD')};"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_count_insert AFTER INSERT ON {table} BEGIN {increment} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_count_delete AFTER DELETE ON {table} BEGIN {decrement} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_count_status AFTER UPDATE OF status ON {table} "
+        f"WHEN OLD.status IS NOT NEW.status BEGIN {decrement} {increment} END",
+    ]
+
+# Passwords-per-user distribution, counted as "passwords_per_user:<label>"
+PASSWORD_BUCKETS = [(0, '0'), (5, '1-5'), (20, '6-20'), (None, '21+')]
+
+def _password_bucket(column):
+    cases = " ".join(f"WHEN {column} <= {limit} THEN '{label}'" for limit, label in PASSWORD_BUCKETS if limit is not None)
+    return f"'passwords_per_user:' || CASE {cases} ELSE '{PASSWORD_BUCKETS[-1][1]}' END"
+
+def _password_triggers():
+    increment = ("INSERT INTO dashboard_counters (name, value) VALUES ({name}, 1) "
+                 "ON CONFLICT(name) DO UPDATE SET value = value + 1;")
+    decrement = "UPDATE dashboard_counters SET value = value - 1 WHERE name = {name};"
+    bucket = f"(SELECT {_password_bucket('n')} FROM (SELECT COUNT(*) AS n FROM passwords WHERE user_id = NEW.id))"
+
+    # Moves between buckets as passwords change are made by the user_stats
+    # triggers, which already hold each owner's count (see _password_stats_triggers)
+    return [
+        "CREATE TRIGGER IF NOT EXISTS trg_passwords_count_insert AFTER INSERT ON passwords BEGIN "
+        + increment.format(name="'passwords'") + " END",
+        "CREATE TRIGGER IF NOT EXISTS trg_passwords_count_delete AFTER DELETE ON passwords BEGIN "
+        + decrement.format(name="'passwords'") + " END",
+        "CREATE TRIGGER IF NOT EXISTS trg_users_bucket_insert AFTER INSERT ON users BEGIN "
+        + increment.format(name=bucket) + " END",
+    ]
+
+# Recomputes every dashboard counter from the base tables in one statement
+DASHBOARD_COUNTER_SQL = " UNION ALL ".join(
+    [f"SELECT '{table}:' || COALESCE(status, ''), COUNT(*) FROM {table} GROUP BY status" for table in COUNTED_TABLES]
+    + ["SELECT 'passwords', COUNT(*) FROM passwords",
+       f"""SELECT {_password_bucket('n')}, COUNT(*) FROM (
+               SELECT COUNT(p.id) AS n FROM users u LEFT JOIN passwords p ON p.user_id = u.id GROUP BY u.id)
+           GROUP BY 1"""])
+
+# Per-user counters in user_stats: source table -> {column: per-row contribution}
+USER_STAT_SOURCES = {
+    'passwords': {'passwords': "1"},
+    'feedback': {'feedback': "1", 'feedback_pending': "{row}.status IS 'Pending'"},
+    'account_locks': {'lock_events': "1", 'unlock_requests': "{row}.status IS 'Unlock Requested'"},
+    'audit_requests': {'audit_requests': "1", 'audits_completed': "{row}.status IS 'Completed'"},
+}
+USER_STATS_COLUMNS = [column for columns in USER_STAT_SOURCES.values() for column in columns]
+
+def _user_stats_changes(table):
+    contributions = USER_STAT_SOURCES[table]
+    columns = ", ".join(contributions)
+    added = ", ".join(expr.format(row='NEW') for expr in contributions.values())
+    updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in contributions)
+    removed = ", ".join(f"{column} = {column} - ({expr.format(row='OLD')})" for column, expr in contributions.items())
+    # INSERT ... SELECT needs the WHERE clause for SQLite to parse the upsert
+    increment = (f"INSERT INTO user_stats (user_id, {columns}) SELECT NEW.user_id, {added} "
+                 f"WHERE NEW.user_id IS NOT NULL ON CONFLICT(user_id) DO UPDATE SET {updates};")
+    decrement = f"UPDATE user_stats SET {removed} WHERE user_id = OLD.user_id;"
+    return increment, decrement
+
+def _user_stats_triggers(table):
+    increment, decrement = _user_stats_changes(table)
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_user_stats_insert AFTER INSERT ON {table} BEGIN {increment} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_user_stats_delete AFTER DELETE ON {table} BEGIN {decrement} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_user_stats_update AFTER UPDATE OF user_id, status ON {table} "
+        f"BEGIN {decrement} {increment} END",
+    ]
+
+def _bucket_move(row):
+    # Moves the row's owner from the bucket of its previous password count to
+    # that of its current one, read from user_stats after it has been updated
+    owner = f"EXISTS (SELECT 1 FROM users WHERE id = {row}.user_id)"
+    count = f"(SELECT passwords FROM user_stats WHERE user_id = {row}.user_id)"
+    previous = f"{count} {'-' if row == 'NEW' else '+'} 1"
+    return (f"UPDATE dashboard_counters SET value = value - 1 "
+            f"WHERE name = (SELECT {_password_bucket('n')} FROM (SELECT {previous} AS n)) AND {owner}; "
+            f"INSERT INTO dashboard_counters (name, value) SELECT {_password_bucket('n')}, 1 FROM (SELECT {count} AS n) "
+            f"WHERE {owner} ON CONFLICT(name) DO UPDATE SET value = value + 1;")
+
+def _password_stats_triggers():
+    # One trigger per event, so the bucket move runs after the user_stats change
+    # it reads, instead of recounting the owner's passwords on every row.
+    # Passwords whose owner has no users row are left out of the distribution,
+    # as in the live query
+    increment, decrement = _user_stats_changes('passwords')
+    return [
+        "CREATE TRIGGER IF NOT EXISTS trg_passwords_stats_insert AFTER INSERT ON passwords "
+        f"BEGIN {increment} {_bucket_move('NEW')} END",
+        "CREATE TRIGGER IF NOT EXISTS trg_passwords_stats_delete AFTER DELETE ON passwords "
+        f"BEGIN {decrement} {_bucket_move('OLD')} END",
+        "CREATE TRIGGER IF NOT EXISTS trg_passwords_stats_update AFTER UPDATE OF user_id ON passwords "
+        f"WHEN OLD.user_id IS NOT NEW.user_id BEGIN {decrement} {_bucket_move('OLD')} {increment} {_bucket_move('NEW')} END",
+    ]
+
+# Recomputes user_stats rows from the base tables
+USER_STATS_SQL = "SELECT user_id, {sums} FROM ({parts}) GROUP BY user_id".format(
+    sums=", ".join(f"SUM({column})" for column in USER_STATS_COLUMNS),
+    parts=" UNION ALL ".join(
+        "SELECT user_id, " + ", ".join(
+            (f"SUM({source[column].format(row=table)})" if column in source else "0") + f" AS {column}"
+            for column in USER_STATS_COLUMNS) + f" FROM {table} WHERE user_id IS NOT NULL GROUP BY user_id"
+        for table, source in USER_STAT_SOURCES.items()))
+
+# Ordered, append-only list of schema changes applied on top of the base
+# tables created above. Never edit a released step; add a new version.
+SCHEMA_MIGRATIONS = [
+    (1, "Secondary indexes for DAO lookups", [
+        "CREATE INDEX IF NOT EXISTS idx_users_status ON users(status)",
+        "CREATE INDEX IF NOT EXISTS idx_passwords_user ON passwords(user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_feedback_timestamp ON feedback(timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_account_locks_user_status ON account_locks(user_id, status)",
+        "CREATE INDEX IF NOT EXISTS idx_account_locks_status_timestamp ON account_locks(status, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_audit_requests_status_timestamp ON audit_requests(status, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_audit_requests_user_timestamp ON audit_requests(user_id, timestamp)",
+    ]),
+    (2, "Per-row encryption key IDs and key rotation checkpoints", [
+        "ALTER TABLE passwords ADD COLUMN key_id INTEGER",
+        '''CREATE TABLE IF NOT EXISTS key_rotations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                target_key_id INTEGER,
+                last_row_id INTEGER DEFAULT 0,
+                rows_rotated INTEGER DEFAULT 0,
+                status TEXT DEFAULT 'Running',
+                started_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                completed_at DATETIME)''',
+    ]),
+    (3, "SQLite activity log store", [
+        '''CREATE TABLE IF NOT EXISTS activity_log (
+                id INTEGER PRIMARY KEY,
+                ts TEXT NOT NULL,
+                username TEXT NOT NULL,
+                action TEXT NOT NULL)''',
+        "CREATE INDEX IF NOT EXISTS idx_activity_log_user_ts ON activity_log(username, ts)",
+    ]),
+    (4, "Integer event codes for activity log rows", [
+        "ALTER TABLE activity_log ADD COLUMN event INTEGER NOT NULL DEFAULT 0",
+        "CREATE INDEX IF NOT EXISTS idx_activity_log_user_event ON activity_log(username, event)",
+    ]),
+    (5, "Trigger-maintained dashboard counters", [
+        '''CREATE TABLE IF NOT EXISTS dashboard_counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL DEFAULT 0)''',
+        f"INSERT INTO dashboard_counters (name, value) {DASHBOARD_COUNTER_SQL}",
+        *[trigger for table in COUNTED_TABLES for trigger in _counter_triggers(table)],
+        *_password_triggers(),
+    ]),
+    (6, "Trigger-maintained per-user stats", [
+        '''CREATE TABLE IF NOT EXISTS user_stats (
+                user_id INTEGER PRIMARY KEY,
+                passwords INTEGER NOT NULL DEFAULT 0,
+                feedback INTEGER NOT NULL DEFAULT 0,
+                feedback_pending INTEGER NOT NULL DEFAULT 0,
+                lock_events INTEGER NOT NULL DEFAULT 0,
+                unlock_requests INTEGER NOT NULL DEFAULT 0,
+                audit_requests INTEGER NOT NULL DEFAULT 0,
+                audits_completed INTEGER NOT NULL DEFAULT 0)''',
+        f"INSERT INTO user_stats (user_id, {', '.join(USER_STATS_COLUMNS)}) {USER_STATS_SQL}",
+        *[trigger for table in USER_STAT_SOURCES if table != 'passwords' for trigger in _user_stats_triggers(table)],
+        *_password_stats_triggers(),
+    ]),
+    (7, "Feedback status index for the paged admin view", [
+        "CREATE INDEX IF NOT EXISTS idx_feedback_status_timestamp ON feedback(status, timestamp)",
+    ]),
+]
+
+def get_schema_version():
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='schema_version'")
+        if not c.fetchone():
+            return 0
+        c.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        return c.fetchone()[0]
+
+def migrate_database():
+    with get_connection() as conn:
+        conn.execute('''CREATE TABLE IF NOT EXISTS schema_version (
+                            version INTEGER PRIMARY KEY,
+                            description TEXT,
+                            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP)''')
     
-    conn.commit()
-    conn.close()
+    applied = []
+    current = get_schema_version()
+    for version, description, statements in SCHEMA_MIGRATIONS:
+        if version <= current:
+            continue
+        # One transaction per step so a failed step leaves the previous version intact
+        with get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            c = conn.cursor()
+            c.execute("SELECT 1 FROM schema_version WHERE version=?", (version,))
+            if c.fetchone():
+                continue
+            for statement in statements:
+                c.execute(statement)
+            c.execute("INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                      (version, description))
+        applied.append(version)
+    return applied
+
+# SQL for each DAO statement, shared with the query plan report (DAO_QUERIES)
+INSERT_USER_SQL = "INSERT INTO users (username, password) VALUES (?, ?)"
+INSERT_USER_PROFILE_SQL = "INSERT INTO user_profiles (user_id, name, email, purpose, organization) VALUES (?, ?, ?, ?, ?)"
 
 def add_user(username, password, name=None, email=None, purpose=None, organization=None):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
     try:
-        c.execute("INSERT INTO users (username, password) VALUES (?, ?)", 
-                  (username, hash_password(password)))
-        user_id = c.lastrowid
-        
-        c.execute("INSERT INTO user_profiles (user_id, name, email, purpose, organization) VALUES (?, ?, ?, ?, ?)",
-                  (user_id, name, email, purpose, organization))
-        
-        conn.commit()
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute(INSERT_USER_SQL, 
+                      (username, hash_password(password)))
+            user_id = c.lastrowid
+            
+            c.execute(INSERT_USER_PROFILE_SQL,
+                      (user_id, name, email, purpose, organization))
         result = True
     except:
         result = False
-    conn.close()
     return result
 
+USER_BY_NAME_SQL = "SELECT * FROM users WHERE username=?"
+REHASH_USER_PASSWORD_SQL = "UPDATE users SET password=? WHERE id=? AND password=?"
+
 def get_user(username, password):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT * FROM users WHERE username=? AND password=?", 
-              (username, hash_password(password)))
-    user = c.fetchone()
-    conn.close()
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(USER_BY_NAME_SQL, (username,))
+        user = c.fetchone()
+    
+    if not user or not verify_password(password, user[2]):
+        return None
+    
+    # Transparently upgrade legacy SHA-256 rows and outdated cost parameters
+    if needs_rehash(user[2]):
+        new_hash = hash_password(password)
+        with get_connection() as conn:
+            conn.execute(REHASH_USER_PASSWORD_SQL,
+                         (new_hash, user[0], user[2]))
+        user = (user[0], user[1], new_hash) + tuple(user[3:])
     return user
 
 def get_user_by_name(username):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT * FROM users WHERE username=?", (username,))
-    user = c.fetchone()
-    conn.close()
-    return user
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(USER_BY_NAME_SQL, (username,))
+        return c.fetchone()
+
+USER_AUDIT_REQUESTS_SQL = "SELECT id, timestamp, status FROM audit_requests WHERE user_id=? ORDER BY timestamp DESC"
 
 def get_user_audit_requests(user_id):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT id, timestamp, status FROM audit_requests WHERE user_id=? ORDER BY timestamp DESC", (user_id,))
-    audits = c.fetchall()
-    conn.close()
-    return audits
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(USER_AUDIT_REQUESTS_SQL, (user_id,))
+        return c.fetchall()
+
+USER_BY_ID_SQL = "SELECT * FROM users WHERE id=?"
 
 def get_user_by_id(user_id):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT * FROM users WHERE id=?", (user_id,))
-    user = c.fetchone()
-    conn.close()
-    return user
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(USER_BY_ID_SQL, (user_id,))
+        return c.fetchone()
+
+ALL_USERS_SQL = """SELECT u.id, u.username, u.status, p.name, p.email 
+                   FROM users u 
+                   LEFT JOIN user_profiles p ON u.id = p.user_id"""
 
 def get_all_users():
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("""SELECT u.id, u.username, u.status, p.name, p.email 
-                 FROM users u 
-                 LEFT JOIN user_profiles p ON u.id = p.user_id""")
-    users = c.fetchall()
-    conn.close()
-    return users
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(ALL_USERS_SQL)
+        return c.fetchall()
+
+USER_PROFILE_SQL = "SELECT name, email, purpose, organization FROM user_profiles WHERE user_id=?"
 
 def get_user_profile(user_id):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT name, email, purpose, organization FROM user_profiles WHERE user_id=?", (user_id,))
-    profile = c.fetchone()
-    conn.close()
-    return profile
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(USER_PROFILE_SQL, (user_id,))
+        return c.fetchone()
+
+UPDATE_USER_STATUS_SQL = "UPDATE users SET status=? WHERE id=?"
 
 def update_user_status(user_id, status):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("UPDATE users SET status=? WHERE id=?", (status, user_id))
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        conn.execute(UPDATE_USER_STATUS_SQL, (status, user_id))
+
+INSERT_PASSWORD_SQL = "INSERT INTO passwords (user_id, label, password, key_id) VALUES (?, ?, ?, ?)"
 
 def add_password(user_id, label, password):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("INSERT INTO passwords (user_id, label, password) VALUES (?, ?, ?)", 
-              (user_id, label, encrypt_password(password)))
-    conn.commit()
-    conn.close()
+    token, key_id = encrypt_password_with_key_id(password)
+    with get_connection() as conn:
+        conn.execute(INSERT_PASSWORD_SQL, 
+                     (user_id, label, token, key_id))
+
+def add_passwords(user_id, entries, workers=None):
+    # entries: list of (label, password); encrypted in parallel and inserted in one transaction
+    key_id = get_primary_key_id()
+    tokens = encrypt_many([password for _, password in entries], key_id=key_id, workers=workers)
+    with get_connection() as conn:
+        conn.executemany(INSERT_PASSWORD_SQL,
+                         [(user_id, label, token, key_id) for (label, _), token in zip(entries, tokens)])
+    return len(entries)
+
+VAULT_BATCH_SQL = "SELECT id, label, password, key_id FROM passwords WHERE user_id=? AND id > ? ORDER BY id LIMIT ?"
+
+def iter_vault_batches(user_id, batch_size=PAGE_SIZE):
+    # Keyset batches of VaultEntry rows, so a large vault is never loaded at once
+    after_id = 0
+    while True:
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute(VAULT_BATCH_SQL, (user_id, after_id, batch_size))
+            entries = [VaultEntry(*r) for r in c.fetchall()]
+        if not entries:
+            return
+        yield entries
+        after_id = entries[-1].id
+
+class VaultEntry:
+    # Vault row that keeps the ciphertext and only decrypts on first access
+    __slots__ = ('id', 'label', 'ciphertext', 'key_id', '_password')
+
+    def __init__(self, record_id, label, ciphertext, key_id=None):
+        self.id = record_id
+        self.label = label
+        self.ciphertext = ciphertext
+        self.key_id = key_id
+        self._password = None
+
+    @property
+    def decrypted(self):
+        return self._password is not None
+
+    @property
+    def password(self):
+        if self._password is None:
+            self._password = decrypt_password(self.ciphertext, self.key_id)
+        return self._password
+
+    def __repr__(self):
+        return f"VaultEntry(id={self.id!r}, label={self.label!r})"
+
+def decrypt_entries(entries, workers=None):
+    pending = [entry for entry in entries if not entry.decrypted]
+    passwords = decrypt_many([e.ciphertext for e in pending], [e.key_id for e in pending], workers)
+    for entry, password in zip(pending, passwords):
+        entry._password = password
+    return entries
+
+VAULT_ENTRIES_SQL = "SELECT id, label, password, key_id FROM passwords WHERE user_id=?"
+
+def get_vault_entries(user_id):
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(VAULT_ENTRIES_SQL, (user_id,))
+        return [VaultEntry(*r) for r in c.fetchall()]
 
 def get_passwords(user_id):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT id, label, password FROM passwords WHERE user_id=?", (user_id,))
-    records = c.fetchall()
-    conn.close()
-    return [(r[0], r[1], decrypt_password(r[2])) for r in records]
+    entries = decrypt_entries(get_vault_entries(user_id))
+    return [(e.id, e.label, e.password) for e in entries]
 
 def get_passwords_dataframe(user_id):
+    import pandas as pd
+    
     records = get_passwords(user_id)
     if not records:
         return pd.DataFrame(columns=['ID', 'Label', 'Password'])
@@ -159,133 +581,306 @@ def get_passwords_dataframe(user_id):
     df = pd.DataFrame(records, columns=['ID', 'Label', 'Password'])
     return df
 
+UPDATE_PASSWORD_SQL = "UPDATE passwords SET password=?, key_id=? WHERE id=?"
+
 def update_password(record_id, new_password):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("UPDATE passwords SET password=? WHERE id=?", 
-              (encrypt_password(new_password), record_id))
-    conn.commit()
-    conn.close()
+    token, key_id = encrypt_password_with_key_id(new_password)
+    with get_connection() as conn:
+        conn.execute(UPDATE_PASSWORD_SQL, 
+                     (token, key_id, record_id))
+
+DELETE_PASSWORD_SQL = "DELETE FROM passwords WHERE id=?"
 
 def delete_password(record_id):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("DELETE FROM passwords WHERE id=?", (record_id,))
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        conn.execute(DELETE_PASSWORD_SQL, (record_id,))
+
+INSERT_FEEDBACK_SQL = "INSERT INTO feedback (user_id, username, feedback) VALUES (?, ?, ?)"
 
 def add_feedback(user_id, username, feedback):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("INSERT INTO feedback (user_id, username, feedback) VALUES (?, ?, ?)",
-              (user_id, username, feedback))
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        conn.execute(INSERT_FEEDBACK_SQL,
+                     (user_id, username, feedback))
+
+ALL_FEEDBACK_SQL = "SELECT id, username, feedback, timestamp, status FROM feedback ORDER BY timestamp DESC"
 
 def get_all_feedback():
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT id, username, feedback, timestamp, status FROM feedback ORDER BY timestamp DESC")
-    feedback = c.fetchall()
-    conn.close()
-    return feedback
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(ALL_FEEDBACK_SQL)
+        return c.fetchall()
+
+RESOLVE_FEEDBACK_SQL = "UPDATE feedback SET status='Resolved' WHERE id=?"
 
 def mark_feedback_resolved(feedback_id):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("UPDATE feedback SET status='Resolved' WHERE id=?", (feedback_id,))
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        conn.execute(RESOLVE_FEEDBACK_SQL, (feedback_id,))
+
+LOCK_USER_SQL = "UPDATE users SET status='Locked' WHERE id=?"
+INSERT_ACCOUNT_LOCK_SQL = "INSERT INTO account_locks (user_id, username, reason) VALUES (?, ?, ?)"
 
 def lock_user_account(user_id, username, reason):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("UPDATE users SET status='Locked' WHERE id=?", (user_id,))
-    c.execute("INSERT INTO account_locks (user_id, username, reason) VALUES (?, ?, ?)",
-              (user_id, username, reason))
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(LOCK_USER_SQL, (user_id,))
+        c.execute(INSERT_ACCOUNT_LOCK_SQL,
+                  (user_id, username, reason))
+
+REQUEST_UNLOCK_SQL = "UPDATE account_locks SET reason=?, status='Unlock Requested' WHERE user_id=? AND status='Locked'"
+INSERT_UNLOCK_REQUEST_SQL = ("INSERT INTO account_locks (user_id, username, reason, status) "
+                             "VALUES (?, ?, ?, 'Unlock Requested')")
 
 def request_account_unlock(user_id, username, reason):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("UPDATE account_locks SET reason=?, status='Unlock Requested' WHERE user_id=? AND status='Locked'",
-              (reason, user_id))
-    if c.rowcount == 0:
-        c.execute("INSERT INTO account_locks (user_id, username, reason, status) VALUES (?, ?, ?, 'Unlock Requested')",
-                  (user_id, username, reason))
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(REQUEST_UNLOCK_SQL,
+                  (reason, user_id))
+        if c.rowcount == 0:
+            c.execute(INSERT_UNLOCK_REQUEST_SQL,
+                      (user_id, username, reason))
+
+UNLOCK_REQUESTS_SQL = "SELECT id, username, reason, timestamp FROM account_locks WHERE status='Unlock Requested' ORDER BY timestamp DESC"
 
 def get_account_lock_requests():
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT id, username, reason, timestamp FROM account_locks WHERE status='Unlock Requested' ORDER BY timestamp DESC")
-    requests = c.fetchall()
-    conn.close()
-    return requests
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(UNLOCK_REQUESTS_SQL)
+        return c.fetchall()
+
+LOCK_REQUEST_USER_SQL = "SELECT user_id FROM account_locks WHERE id=?"
+APPROVE_USER_SQL = "UPDATE users SET status='Approved' WHERE id=?"
+MARK_UNLOCKED_SQL = "UPDATE account_locks SET status='Unlocked' WHERE id=?"
 
 def unlock_user_account(request_id):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT user_id FROM account_locks WHERE id=?", (request_id,))
-    result = c.fetchone()
-    if result:
-        user_id = result[0]
-        c.execute("UPDATE users SET status='Approved' WHERE id=?", (user_id,))
-        c.execute("UPDATE account_locks SET status='Unlocked' WHERE id=?", (request_id,))
-        conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(LOCK_REQUEST_USER_SQL, (request_id,))
+        result = c.fetchone()
+        if result:
+            user_id = result[0]
+            c.execute(APPROVE_USER_SQL, (user_id,))
+            c.execute(MARK_UNLOCKED_SQL, (request_id,))
+
+INSERT_AUDIT_REQUEST_SQL = "INSERT INTO audit_requests (user_id, username) VALUES (?, ?)"
 
 def add_audit_request(user_id, username):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("INSERT INTO audit_requests (user_id, username) VALUES (?, ?)",
-              (user_id, username))
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        conn.execute(INSERT_AUDIT_REQUEST_SQL,
+                     (user_id, username))
+
+PENDING_AUDITS_SQL = "SELECT id, username, timestamp, status FROM audit_requests WHERE status='Pending' ORDER BY timestamp DESC"
 
 def get_audit_requests():
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT id, username, timestamp, status FROM audit_requests WHERE status='Pending' ORDER BY timestamp DESC")
-    requests = c.fetchall()
-    conn.close()
-    return requests
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(PENDING_AUDITS_SQL)
+        return c.fetchall()
+
+COMPLETE_AUDIT_SQL = "UPDATE audit_requests SET status='Completed' WHERE id=?"
 
 def mark_audit_completed(audit_id):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("UPDATE audit_requests SET status='Completed' WHERE id=?", (audit_id,))
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        conn.execute(COMPLETE_AUDIT_SQL, (audit_id,))
 
 def get_user_statistics():
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    
-    c.execute("SELECT COUNT(*) FROM users")
-    total_users = c.fetchone()[0]
-    
-    c.execute("SELECT status, COUNT(*) FROM users GROUP BY status")
-    status_counts = dict(c.fetchall())
-    
-    c.execute("SELECT COUNT(*) FROM passwords")
-    total_passwords = c.fetchone()[0]
+    from modules.dashboard import get_dashboard_statistics
+
+    stats = get_dashboard_statistics()
+    return {
+        'total_users': stats['total_users'],
+        'status_breakdown': stats['status_breakdown'],
+        'total_passwords': stats['total_passwords']
+    }
+
+USER_STATS_ROW_SQL = f"SELECT {', '.join(USER_STATS_COLUMNS)} FROM user_stats WHERE user_id=?"
+
+def get_user_stats(user_id):
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(USER_STATS_ROW_SQL, (user_id,))
+        row = c.fetchone()
+    return dict(zip(USER_STATS_COLUMNS, row or [0] * len(USER_STATS_COLUMNS)))
+
+def get_storage_report():
+    with get_connection() as conn:
+        c = conn.cursor()
+        report = {'profile': STORAGE_PROFILE}
+        for pragma in ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store', 'busy_timeout',
+                       'page_size', 'page_count', 'freelist_count'):
+            c.execute(f"PRAGMA {pragma}")
+            report[pragma] = c.fetchone()[0]
+    report['synchronous'] = SYNCHRONOUS_MODES.get(report['synchronous'], report['synchronous'])
+    report['temp_store'] = TEMP_STORE_MODES.get(report['temp_store'], report['temp_store'])
+    return report
+
+USER_COMPLETED_AUDITS_SQL = ("SELECT id, username, timestamp, status FROM audit_requests "
+                             "WHERE user_id=? AND status='Completed' ORDER BY timestamp DESC")
+
+def get_user_completed_audits(user_id):
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(USER_COMPLETED_AUDITS_SQL, (user_id,))
+        return c.fetchall()
+
+def _list_filters(status_column=None, status=None, username_column=None, username=None,
+                  time_column=None, since=None, until=None):
+    clauses, params = [], []
+    if status is not None:
+        statuses = [status] if isinstance(status, str) else list(status)
+        clauses.append(f"{status_column} IN ({', '.join('?' * len(statuses))})")
+        params.extend(statuses)
+    if username:
+        # Prefix match; escape LIKE wildcards typed by the admin
+        clauses.append(f"{username_column} LIKE ? ESCAPE '\\'")
+        params.append(username.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+    if since:
+        clauses.append(f"{time_column} >= ?")
+        params.append(since)
+    if until:
+        clauses.append(f"{time_column} <= ?")
+        params.append(until)
+    return clauses, params
+
+def _keyset_query(select, clauses, params, keys, descending=True, cursor=None, backwards=False, limit=PAGE_SIZE):
+    # keys: (column, row index) pairs that form a unique sort key. A page
+    # continues strictly after (or, going backwards, before) the cursor's key,
+    # so each page costs one index range scan regardless of its position.
+    clauses, params = list(clauses), list(params)
+    scan_descending = descending != backwards
+    if cursor is not None:
+        columns = ", ".join(column for column, _ in keys)
+        clauses.append(f"({columns}) {'<' if scan_descending else '>'} ({', '.join('?' * len(keys))})")
+        params.extend(cursor)
+    sql = select
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    order = "DESC" if scan_descending else "ASC"
+    sql += " ORDER BY " + ", ".join(f"{column} {order}" for column, _ in keys) + " LIMIT ?"
+    params.append(limit + 1)
+    return sql, params
+
+def _keyset_page(select, clauses, params, keys, descending=True, cursor=None, backwards=False, limit=PAGE_SIZE):
+    sql, params = _keyset_query(select, clauses, params, keys, descending, cursor, backwards, limit)
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(sql, params)
+        rows = c.fetchall()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
     
-    conn.close()
+    def key(row):
+        return tuple(row[index] for _, index in keys)
     
     return {
-        'total_users': total_users,
-        'status_breakdown': status_counts,
-        'total_passwords': total_passwords
+        'rows': rows,
+        'first': key(rows[0]) if rows else cursor,
+        'last': key(rows[-1]) if rows else cursor,
+        'has_prev': more if backwards else cursor is not None,
+        'has_next': cursor is not None if backwards else more,
     }
 
-def get_user_completed_audits(user_id):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT id, username, timestamp, status FROM audit_requests WHERE user_id=? AND status='Completed' ORDER BY timestamp DESC", (user_id,))
-    audits = c.fetchall()
-    conn.close()
-    return audits
+USER_PROFILE_COLUMNS = """SELECT u.id, u.username, u.status, p.name, p.email, p.purpose, p.organization
+                          FROM users u
+                          LEFT JOIN user_profiles p ON u.id = p.user_id"""
+
+USERS_PAGE_KEYS = [("u.id", 0)]
+
+def get_users_page(status=None, username=None, cursor=None, backwards=False, limit=PAGE_SIZE):
+    clauses, params = _list_filters("u.status", status, "u.username", username)
+    return _keyset_page(USER_PROFILE_COLUMNS, clauses, params, USERS_PAGE_KEYS, descending=False,
+                        cursor=cursor, backwards=backwards, limit=limit)
+
+FEEDBACK_PAGE_SQL = "SELECT id, username, feedback, timestamp, status FROM feedback"
+FEEDBACK_PAGE_KEYS = [("timestamp", 3), ("id", 0)]
+
+def get_feedback_page(status=None, username=None, since=None, until=None, cursor=None, backwards=False,
+                      limit=PAGE_SIZE):
+    clauses, params = _list_filters("status", status, "username", username, "timestamp", since, until)
+    return _keyset_page(FEEDBACK_PAGE_SQL, clauses, params, FEEDBACK_PAGE_KEYS, cursor=cursor, backwards=backwards, limit=limit)
+
+LOCK_REQUESTS_PAGE_SQL = "SELECT id, username, reason, timestamp FROM account_locks"
+LOCK_REQUESTS_PAGE_KEYS = [("timestamp", 3), ("id", 0)]
+
+def get_lock_requests_page(status="Unlock Requested", username=None, since=None, until=None, cursor=None,
+                           backwards=False, limit=PAGE_SIZE):
+    clauses, params = _list_filters("status", status, "username", username, "timestamp", since, until)
+    return _keyset_page(LOCK_REQUESTS_PAGE_SQL, clauses, params, LOCK_REQUESTS_PAGE_KEYS, cursor=cursor, backwards=backwards, limit=limit)
+
+AUDIT_REQUESTS_PAGE_SQL = "SELECT id, username, timestamp, status, user_id FROM audit_requests"
+AUDIT_REQUESTS_PAGE_KEYS = [("timestamp", 2), ("id", 0)]
+
+def get_audit_requests_page(status="Pending", username=None, since=None, until=None, cursor=None,
+                            backwards=False, limit=PAGE_SIZE):
+    clauses, params = _list_filters("status", status, "username", username, "timestamp", since, until)
+    return _keyset_page(AUDIT_REQUESTS_PAGE_SQL, clauses, params, AUDIT_REQUESTS_PAGE_KEYS, cursor=cursor, backwards=backwards, limit=limit)
+
+def _page_plan(name, select, keys, status_column, status, descending=True):
+    # First-page and next-page statements as get_*_page builds them for a status filter
+    clauses, params = _list_filters(status_column, status)
+    cursor = tuple('~' if column.endswith("timestamp") else 0 for column, _ in keys)
+    return [(name, *_keyset_query(select, clauses, params, keys, descending)),
+            (f"{name}/next", *_keyset_query(select, clauses, params, keys, descending, cursor=cursor))]
+
+# Representative parameters for every DAO statement, used to report query plans
+DAO_QUERIES = [
+    ("add_user", INSERT_USER_SQL, ('user', 'hash')),
+    ("add_user/profile", INSERT_USER_PROFILE_SQL, (1, 'name', 'email', 'purpose', 'organization')),
+    ("get_user", USER_BY_NAME_SQL, ('user',)),
+    ("rehash_user_password", REHASH_USER_PASSWORD_SQL, ('hash', 1, 'hash')),
+    ("get_user_by_name", USER_BY_NAME_SQL, ('user',)),
+    ("get_user_by_id", USER_BY_ID_SQL, (1,)),
+    ("get_user_audit_requests", USER_AUDIT_REQUESTS_SQL, (1,)),
+    ("get_all_users", ALL_USERS_SQL, ()),
+    *_page_plan("get_users_page", USER_PROFILE_COLUMNS, USERS_PAGE_KEYS, "u.status", 'Pending', descending=False),
+    ("get_user_profile", USER_PROFILE_SQL, (1,)),
+    ("update_user_status", UPDATE_USER_STATUS_SQL, ('Approved', 1)),
+    ("add_password", INSERT_PASSWORD_SQL, (1, 'label', 'token', 1)),
+    ("get_passwords", VAULT_ENTRIES_SQL, (1,)),
+    ("iter_vault_batches", VAULT_BATCH_SQL, (1, 0, PAGE_SIZE)),
+    ("update_password", UPDATE_PASSWORD_SQL, ('token', 1, 1)),
+    ("delete_password", DELETE_PASSWORD_SQL, (1,)),
+    ("add_feedback", INSERT_FEEDBACK_SQL, (1, 'user', 'feedback')),
+    ("get_all_feedback", ALL_FEEDBACK_SQL, ()),
+    *_page_plan("get_feedback_page", FEEDBACK_PAGE_SQL, FEEDBACK_PAGE_KEYS, "status", 'Pending'),
+    ("mark_feedback_resolved", RESOLVE_FEEDBACK_SQL, (1,)),
+    ("lock_user_account", LOCK_USER_SQL, (1,)),
+    ("lock_user_account/insert", INSERT_ACCOUNT_LOCK_SQL, (1, 'user', 'reason')),
+    ("request_account_unlock", REQUEST_UNLOCK_SQL, ('reason', 1)),
+    ("request_account_unlock/insert", INSERT_UNLOCK_REQUEST_SQL, (1, 'user', 'reason')),
+    ("get_account_lock_requests", UNLOCK_REQUESTS_SQL, ()),
+    *_page_plan("get_lock_requests_page", LOCK_REQUESTS_PAGE_SQL, LOCK_REQUESTS_PAGE_KEYS, "status", 'Unlock Requested'),
+    ("unlock_user_account", LOCK_REQUEST_USER_SQL, (1,)),
+    ("unlock_user_account/approve", APPROVE_USER_SQL, (1,)),
+    ("unlock_user_account/unlock", MARK_UNLOCKED_SQL, (1,)),
+    ("add_audit_request", INSERT_AUDIT_REQUEST_SQL, (1, 'user')),
+    ("get_audit_requests", PENDING_AUDITS_SQL, ()),
+    *_page_plan("get_audit_requests_page", AUDIT_REQUESTS_PAGE_SQL, AUDIT_REQUESTS_PAGE_KEYS, "status", 'Pending'),
+    ("mark_audit_completed", COMPLETE_AUDIT_SQL, (1,)),
+    ("get_user_stats", USER_STATS_ROW_SQL, (1,)),
+    ("get_user_completed_audits", USER_COMPLETED_AUDITS_SQL, (1,)),
+]
+
+# Tables that only ever hold a handful of rows, where reading every row is
+# cheaper than an index lookup and is not reported as a full table scan
+SMALL_TABLES = ('dashboard_counters',)
+
+def _is_full_scan(step):
+    # "SCAN <table>" without an index is a full table scan
+    words = step.split()
+    return words[0] == "SCAN" and "USING" not in words and words[1] not in SMALL_TABLES
+
+def explain_dao_queries():
+    # Queries owned by modules that import this one are planned here as well
+    from modules.dashboard import DASHBOARD_DAO_QUERIES
+    from modules.activity_store import ACTIVITY_DAO_QUERIES
 
+    report = []
+    with get_connection() as conn:
+        c = conn.cursor()
+        for name, sql, params in DAO_QUERIES + DASHBOARD_DAO_QUERIES + ACTIVITY_DAO_QUERIES:
+            c.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            steps = [row[3] for row in c.fetchall()]
+            report.append({'query': name, 'plan': steps, 'full_scan': any(_is_full_scan(step) for step in steps)})
+    return report
@@ -0,0 +1,84 @@
+from enum import IntEnum
+from functools import lru_cache
+
+class EventType(IntEnum):
+    OTHER = 0
+    SYSTEM = 1
+    LOGIN = 2
+    LOGOUT = 3
+    REGISTRATION = 4
+    PASSWORD_ADDED = 5
+    PASSWORD_VIEWED = 6
+    PASSWORD_UPDATED = 7
+    PASSWORD_DELETED = 8
+    PASSWORD_GENERATED = 9
+    STRENGTH_CHECKED = 10
+    FEEDBACK_SUBMITTED = 11
+    FEEDBACK_RESOLVED = 12
+    ACCOUNT_LOCKED = 13
+    UNLOCK_REQUESTED = 14
+    ACCOUNT_UNLOCKED = 15
+    AUDIT_REQUESTED = 16
+    AUDIT_COMPLETED = 17
+    AUDIT_VIEWED = 18
+    USER_STATUS_CHANGED = 19
+    LOGS_VIEWED = 20
+    MAINTENANCE = 21
+
+# Category labels in code order, for pd.Categorical.from_codes()
+EVENT_NAMES = [event.name.lower() for event in EventType]
+
+# Classification of lines written before events carried a code. Checked in
+# order, so specific prefixes must come before generic ones.
+LEGACY_PREFIXES = [
+    ("Logged in", EventType.LOGIN),
+    ("Logged out", EventType.LOGOUT),
+    ("Registered", EventType.REGISTRATION),
+    ("Application", EventType.SYSTEM),
+    ("Added password", EventType.PASSWORD_ADDED),
+    ("Viewed saved passwords", EventType.PASSWORD_VIEWED),
+    ("Updated password", EventType.PASSWORD_UPDATED),
+    ("Deleted password", EventType.PASSWORD_DELETED),
+    ("Generated", EventType.PASSWORD_GENERATED),
+    ("Checked password strength", EventType.STRENGTH_CHECKED),
+    ("Compared two passwords", EventType.STRENGTH_CHECKED),
+    ("Submitted feedback", EventType.FEEDBACK_SUBMITTED),
+    ("Resolved feedback", EventType.FEEDBACK_RESOLVED),
+    ("Locked own account", EventType.ACCOUNT_LOCKED),
+    ("Requested account unlock", EventType.UNLOCK_REQUESTED),
+    ("Unlocked account", EventType.ACCOUNT_UNLOCKED),
+    ("Requested account audit", EventType.AUDIT_REQUESTED),
+    ("Account audit completed", EventType.AUDIT_COMPLETED),
+    ("Completed audit", EventType.AUDIT_COMPLETED),
+    ("Viewed completed audit", EventType.AUDIT_VIEWED),
+    ("Viewed audit reports", EventType.AUDIT_VIEWED),
+    ("Approved user", EventType.USER_STATUS_CHANGED),
+    ("Rejected user", EventType.USER_STATUS_CHANGED),
+    ("Changed user", EventType.USER_STATUS_CHANGED),
+    ("Viewed all activity logs", EventType.LOGS_VIEWED),
+    ("Viewed recent activity logs", EventType.LOGS_VIEWED),
+    ("Viewed activity", EventType.LOGS_VIEWED),
+    ("Rotated", EventType.MAINTENANCE),
+    ("Rebuilt", EventType.MAINTENANCE),
+    ("Changed storage profile", EventType.MAINTENANCE),
+    ("Viewed query plans", EventType.MAINTENANCE),
+]
+
+# Text and binary logs append the code to the action as "<action>\t#<code>"
+EVENT_SUFFIX = "\t#"
+
+@lru_cache(maxsize=4096)
+def classify_action(action):
+    for prefix, event in LEGACY_PREFIXES:
+        if action.startswith(prefix):
+            return event
+    return EventType.OTHER
+
+def encode_action(action, event):
+    return f"{action}{EVENT_SUFFIX}{int(event)}"
+
+def decode_action(value):
+    action, sep, code = value.rpartition(EVENT_SUFFIX)
+    if sep and code.isdigit() and int(code) in EventType._value2member_map_:
+        return action, EventType(int(code))
+    return value, classify_action(value)
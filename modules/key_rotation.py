@@ -0,0 +1,90 @@
+from modules.database import get_connection
+from modules.security_utils import add_key, get_primary_key_id, reencrypt_many
+
+ROTATION_BATCH_SIZE = 500
+ROTATION_WORKERS = 4
+
+def get_active_rotation():
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT id, target_key_id, last_row_id, rows_rotated, status, started_at
+                     FROM key_rotations WHERE status='Running' ORDER BY id DESC LIMIT 1""")
+        return c.fetchone()
+
+def get_rotation_history(limit=10):
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT id, target_key_id, rows_rotated, status, started_at, completed_at
+                     FROM key_rotations ORDER BY id DESC LIMIT ?""", (limit,))
+        return c.fetchall()
+
+def start_key_rotation():
+    # A new primary key takes effect immediately for fresh writes; the job
+    # below only has to catch up the rows written under older keys.
+    key_id = add_key()
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("UPDATE key_rotations SET status='Superseded' WHERE status='Running'")
+        c.execute("INSERT INTO key_rotations (target_key_id) VALUES (?)", (key_id,))
+        return c.lastrowid
+
+def count_stale_rows(target_key_id=None):
+    target_key_id = get_primary_key_id() if target_key_id is None else target_key_id
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT COUNT(*) FROM passwords WHERE key_id IS NULL OR key_id != ?", (target_key_id,))
+        return c.fetchone()[0]
+
+def _rotate_batch(rotation_id, target_key_id, after_id, batch_size, workers):
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT id, password, key_id FROM passwords
+                     WHERE id > ? ORDER BY id LIMIT ?""", (after_id, batch_size))
+        rows = c.fetchall()
+    
+    if not rows:
+        return None, 0
+    
+    stale = [r for r in rows if r[2] != target_key_id]
+    tokens = reencrypt_many([r[1] for r in stale], [r[2] for r in stale], target_key_id, workers)
+    last_id = rows[-1][0]
+    
+    with get_connection() as conn:
+        c = conn.cursor()
+        # Guard on the old ciphertext so a concurrent user update is never overwritten
+        c.executemany("UPDATE passwords SET password=?, key_id=? WHERE id=? AND password=?",
+                      [(token, target_key_id, r[0], r[1]) for token, r in zip(tokens, stale)])
+        c.execute("UPDATE key_rotations SET last_row_id=?, rows_rotated=rows_rotated+? WHERE id=?",
+                  (last_id, len(stale), rotation_id))
+    return last_id, len(stale)
+
+def run_key_rotation(batch_size=ROTATION_BATCH_SIZE, workers=ROTATION_WORKERS, progress=None):
+    active = get_active_rotation()
+    if active:
+        rotation_id, target_key_id, last_row_id, rows_rotated = active[:4]
+    else:
+        rotation_id = start_key_rotation()
+        target_key_id, last_row_id, rows_rotated = get_primary_key_id(), 0, 0
+    
+    while True:
+        next_id, rotated = _rotate_batch(rotation_id, target_key_id, last_row_id, batch_size, workers)
+        if next_id is None:
+            # Sessions that loaded the keyring before this job started keep writing
+            # under the old key until they reload it, so rescan until none are left
+            active = get_active_rotation()
+            if not active or active[0] != rotation_id:
+                return {'rotation_id': rotation_id, 'target_key_id': target_key_id, 'rows_rotated': rows_rotated}
+            if not count_stale_rows(target_key_id):
+                break
+            last_row_id = 0
+            continue
+        last_row_id = next_id
+        rows_rotated += rotated
+        if progress:
+            progress(last_row_id, rows_rotated)
+    
+    with get_connection() as conn:
+        conn.execute("UPDATE key_rotations SET status='Completed', completed_at=CURRENT_TIMESTAMP WHERE id=?",
+                     (rotation_id,))
+    
+    return {'rotation_id': rotation_id, 'target_key_id': target_key_id, 'rows_rotated': rows_rotated}
@@ -0,0 +1,524 @@
+import os
+import re
+import sys
+import math
+import struct
+import argparse
+import datetime
+import itertools
+import threading
+from collections import deque, namedtuple
+
+DICTIONARY_FILE = os.environ.get("TOOLKIT_DICTIONARY", "dictionary.trie")
+MAX_ANALYZED_LENGTH = 64
+MAX_ANALYZED_CHUNKS = 4
+MIN_GUESSES_BEFORE_GROWING_SEQUENCE = 10000
+MIN_SINGLE_CHAR_GUESSES = 10
+MIN_MULTI_CHAR_GUESSES = 50
+REFERENCE_YEAR = datetime.date.today().year
+MIN_YEAR_SPACE = 20
+# Entropy (bits) needed for each additional point of the 0-5 strength score
+SCORE_THRESHOLDS = (10, 20, 28, 36, 48)
+
+# Used when no compiled dictionary is available, most common first
+COMMON_WORDS = (
+    "password", "123456", "12345678", "qwerty", "123456789", "12345", "1234", "111111",
+    "1234567", "dragon", "123123", "baseball", "abc123", "football", "monkey", "letmein",
+    "696969", "shadow", "master", "666666", "qwertyuiop", "123321", "mustang", "1234567890",
+    "michael", "654321", "superman", "1qaz2wsx", "7777777", "121212", "000000", "qazwsx",
+    "123qwe", "killer", "trustno1", "jordan", "jennifer", "zxcvbnm", "asdfgh", "hunter",
+    "buster", "soccer", "harley", "batman", "andrew", "tigger", "sunshine", "iloveyou",
+    "2000", "charlie", "robert", "thomas", "hockey", "ranger", "daniel", "starwars",
+    "klaster", "112233", "george", "computer", "michelle", "jessica", "pepper", "1111",
+    "zxcvbn", "555555", "11111111", "131313", "freedom", "777777", "pass", "maggie",
+    "159753", "aaaaaa", "ginger", "princess", "joshua", "cheese", "amanda", "summer",
+    "love", "ashley", "nicole", "chelsea", "biteme", "matthew", "access", "yankees",
+    "987654321", "dallas", "austin", "thunder", "taylor", "matrix", "admin", "welcome",
+    "login", "secret", "hello", "dragon", "flower", "lovely", "whatever", "security",
+    "toolkit", "changeme", "default", "guest", "root", "test", "user", "winter", "spring",
+    "autumn", "monday", "friday", "january", "company", "office", "family", "orange",
+    "purple", "silver", "golden", "banana", "apple", "cookie", "coffee", "house", "money",
+)
+
+L33T_TABLE = {
+    '4': 'a', '@': 'a', '8': 'b', '(': 'c', '{': 'c', '[': 'c', '<': 'c', '3': 'e', '6': 'g',
+    '9': 'g', '1': 'il', '!': 'i', '|': 'il', '0': 'o', '$': 's', '5': 's', '7': 't', '+': 't',
+    '%': 'x', '2': 'z',
+}
+
+KEYBOARD_ROWS = (
+    (0.0, "`1234567890-=", "~!@#$%^&*()_+"),
+    (1.5, "qwertyuiop[]\\", "QWERTYUIOP{}|"),
+    (1.75, "asdfghjkl;'", 'ASDFGHJKL:"'),
+    (2.25, "zxcvbnm,./", "ZXCVBNM<>?"),
+)
+
+Match = namedtuple('Match', ['pattern', 'i', 'j', 'token', 'guesses'])
+
+# Compiled dictionary layout: a header followed by trie nodes in BFS order.
+#   node = rank (uint32, 0 if not a word) | child count (uint8)
+#          | child chars (count bytes, sorted) | child offsets (count x uint32)
+TRIE_MAGIC = b"PSTTRIE1"
+TRIE_HEADER = struct.Struct("<8sI")
+TRIE_NODE = struct.Struct("<IB")
+TRIE_OFFSET = struct.Struct("<I")
+
+class DictionaryTrie:
+    def __init__(self, data):
+        magic, self.word_count = TRIE_HEADER.unpack_from(data)
+        if magic != TRIE_MAGIC:
+            raise ValueError("Not a compiled dictionary file")
+        self.data = data
+        self.root = TRIE_HEADER.size
+
+    def rank(self, node):
+        return TRIE_NODE.unpack_from(self.data, node)[0]
+
+    def child(self, node, char):
+        if len(char) != 1 or ord(char) > 127:
+            return None
+        count = self.data[node + 4]
+        chars_start = node + TRIE_NODE.size
+        index = self.data.find(char.encode(), chars_start, chars_start + count)
+        if index < 0:
+            return None
+        return TRIE_OFFSET.unpack_from(self.data, chars_start + count + 4 * (index - chars_start))[0]
+
+def compile_dictionary(words):
+    root = [0, {}]
+    rank = 0
+    for word in words:
+        word = word.strip().lower()
+        if not word or not word.isascii():
+            continue
+        rank += 1
+        node = root
+        for char in word:
+            node = node[1].setdefault(char, [0, {}])
+        if not node[0]:
+            node[0] = rank
+
+    order = []
+    queue = deque([root])
+    while queue:
+        node = queue.popleft()
+        order.append(node)
+        queue.extend(node[1][char] for char in sorted(node[1]))
+
+    offsets = {}
+    position = TRIE_HEADER.size
+    for node in order:
+        offsets[id(node)] = position
+        position += TRIE_NODE.size + 5 * len(node[1])
+
+    out = bytearray(TRIE_HEADER.pack(TRIE_MAGIC, rank))
+    for node in order:
+        chars = sorted(node[1])
+        out += TRIE_NODE.pack(node[0], len(chars))
+        out += "".join(chars).encode()
+        for char in chars:
+            out += TRIE_OFFSET.pack(offsets[id(node[1][char])])
+    return bytes(out)
+
+def build_dictionary(source_path, output_path=None):
+    output_path = output_path or DICTIONARY_FILE
+    with open(source_path, "r", encoding="utf-8", errors="ignore") as f:
+        data = compile_dictionary(f)
+    with open(output_path, "wb") as f:
+        f.write(data)
+    return TRIE_HEADER.unpack_from(data)[1]
+
+_trie = None
+_trie_lock = threading.Lock()
+
+def get_dictionary():
+    global _trie
+    with _trie_lock:
+        if _trie is None:
+            if os.path.exists(DICTIONARY_FILE):
+                with open(DICTIONARY_FILE, "rb") as f:
+                    _trie = DictionaryTrie(f.read())
+            else:
+                _trie = DictionaryTrie(compile_dictionary(COMMON_WORDS))
+        return _trie
+
+def _build_keyboard_graph():
+    positions = {}
+    for row, (offset, plain, shifted) in enumerate(KEYBOARD_ROWS):
+        for col, (p, s) in enumerate(zip(plain, shifted)):
+            positions[p] = (row, offset + col, False)
+            positions[s] = (row, offset + col, True)
+
+    graph = {}
+    for char, (row, x, _) in positions.items():
+        neighbours = {}
+        for other, (other_row, other_x, _) in positions.items():
+            dy, dx = other_row - row, other_x - x
+            if (dy == 0 and abs(dx) == 1) or (abs(dy) == 1 and abs(dx) <= 0.75):
+                neighbours[other] = (dy, 1 if dx > 0 else -1)
+        graph[char] = neighbours
+
+    keys = len(positions) // 2
+    degree = sum(len(n) for n in graph.values()) / len(graph) / 2
+    return graph, {c: p[2] for c, p in positions.items()}, keys, degree
+
+KEYBOARD_GRAPH, KEYBOARD_SHIFTED, KEYBOARD_KEYS, KEYBOARD_DEGREE = _build_keyboard_graph()
+
+def _case_variations(token):
+    upper = sum(1 for c in token if c.isupper())
+    lower = sum(1 for c in token if c.islower())
+    if upper == 0:
+        return 1
+    if lower == 0 or (upper == 1 and (token[0].isupper() or token[-1].isupper())):
+        return 2
+    return sum(math.comb(upper + lower, k) for k in range(1, min(upper, lower) + 1))
+
+def _dictionary_matches(password, reversed_token=False):
+    trie = get_dictionary()
+    lower = password.lower()
+    n = len(lower)
+    matches = []
+    for i in range(n):
+        stack = [(trie.root, i, 0)]
+        while stack:
+            node, j, subs = stack.pop()
+            if j > i:
+                rank = trie.rank(node)
+                if rank:
+                    token = password[i:j]
+                    guesses = rank * _case_variations(token) * (2 ** subs) * (2 if reversed_token else 1)
+                    matches.append(Match('dictionary', i, j - 1, token, guesses))
+            if j == n:
+                continue
+            char = lower[j]
+            for candidate in char + L33T_TABLE.get(char, ""):
+                child = trie.child(node, candidate)
+                if child is not None:
+                    stack.append((child, j + 1, subs + (candidate != char)))
+    return matches
+
+def _reverse_dictionary_matches(password):
+    n = len(password)
+    return [Match('dictionary', n - 1 - m.j, n - 1 - m.i, m.token[::-1], m.guesses)
+            for m in _dictionary_matches(password[::-1], reversed_token=True)]
+
+def _sequence_matches(password):
+    matches = []
+    n = len(password)
+    i = 0
+    while i < n - 2:
+        delta = ord(password[i + 1]) - ord(password[i])
+        j = i + 1
+        if abs(delta) == 1 and _same_class(password[i], password[j]):
+            while j + 1 < n and ord(password[j + 1]) - ord(password[j]) == delta and _same_class(password[j], password[j + 1]):
+                j += 1
+        if j - i + 1 >= 3:
+            token = password[i:j + 1]
+            first = token[0]
+            base = 4 if first in "aAzZ019" else (10 if first.isdigit() else 26)
+            matches.append(Match('sequence', i, j, token, base * len(token) * (2 if delta < 0 else 1)))
+            i = j
+        else:
+            i += 1
+    return matches
+
+def _same_class(a, b):
+    return (a.isdigit() and b.isdigit()) or (a.islower() and b.islower()) or (a.isupper() and b.isupper())
+
+def _repeat_matches(password, memo):
+    matches = []
+    n = len(password)
+    for i in range(n):
+        for size in range(1, (n - i) // 2 + 1):
+            block = password[i:i + size]
+            # Only report a repeat from its first occurrence, using its
+            # smallest repeating unit ("abab" repeats are reported as "ab")
+            if i >= size and password[i - size:i] == block:
+                continue
+            if size > 1 and (block + block).find(block, 1) != size:
+                continue
+            count = 1
+            while password[i + count * size:i + (count + 1) * size] == block:
+                count += 1
+            if count < 2 or (size == 1 and count < 3):
+                continue
+            block_guesses = 2 ** _estimate_chunk(block, _cardinality(block), memo)[0]
+            matches.append(Match('repeat', i, i + count * size - 1, password[i:i + count * size],
+                                 block_guesses * count))
+    return matches
+
+def _keyboard_guesses(length, turns, shifted, unshifted):
+    guesses = 0
+    for i in range(2, length + 1):
+        for j in range(1, min(turns, i - 1) + 1):
+            guesses += math.comb(i - 1, j - 1) * KEYBOARD_KEYS * KEYBOARD_DEGREE ** j
+    if shifted:
+        guesses *= 2 if unshifted == 0 else sum(math.comb(shifted + unshifted, k)
+                                                 for k in range(1, min(shifted, unshifted) + 1))
+    return guesses
+
+def _keyboard_matches(password):
+    matches = []
+    n = len(password)
+    for i in range(n - 2):
+        j = i
+        turns = 0
+        direction = None
+        while j + 1 < n and password[j + 1] in KEYBOARD_GRAPH.get(password[j], ()):
+            step = KEYBOARD_GRAPH[password[j]][password[j + 1]]
+            if step != direction:
+                turns += 1
+                direction = step
+            j += 1
+        if j - i + 1 >= 3:
+            token = password[i:j + 1]
+            shifted = sum(1 for c in token if KEYBOARD_SHIFTED.get(c))
+            guesses = _keyboard_guesses(len(token), turns, shifted, len(token) - shifted)
+            matches.append(Match('keyboard', i, j, token, guesses))
+    return matches
+
+DATE_WITH_SEPARATOR = re.compile(r"(?=(\d{1,4})([\s/\\_.-])(\d{1,2})\2(\d{1,4}))")
+DIGIT_RUN = re.compile(r"\d{4,8}")
+
+def _valid_date(day, month, year):
+    if year < 100:
+        year += 2000 if year <= REFERENCE_YEAR % 100 else 1900
+    if not (1 <= month <= 12 and 1 <= day <= 31 and 1000 <= year <= 2099):
+        return None
+    return year
+
+def _date_guesses(year, separator):
+    return 365 * max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE) * (4 if separator else 1)
+
+def _split_date(token):
+    candidates = []
+    for year_len in (4, 2):
+        for year_first in (False, True):
+            if len(token) <= year_len:
+                continue
+            year = token[:year_len] if year_first else token[-year_len:]
+            rest = token[year_len:] if year_first else token[:-year_len]
+            if not 2 <= len(rest) <= 4:
+                continue
+            for split in range(1, len(rest)):
+                a, b = int(rest[:split]), int(rest[split:])
+                for day, month in ((a, b), (b, a)):
+                    valid = _valid_date(day, month, int(year))
+                    if valid:
+                        candidates.append(valid)
+    return candidates
+
+def _date_matches(password):
+    matches = []
+    for m in DATE_WITH_SEPARATOR.finditer(password):
+        first, separator, middle, last = m.group(1), m.group(2), m.group(3), m.group(4)
+        token = first + separator + middle + separator + last
+        for day, month, year in ((int(first), int(middle), int(last)), (int(middle), int(first), int(last)),
+                                 (int(last), int(middle), int(first))):
+            valid = _valid_date(day, month, year)
+            if valid:
+                matches.append(Match('date', m.start(), m.start() + len(token) - 1, token,
+                                     _date_guesses(valid, True)))
+                break
+    for run in DIGIT_RUN.finditer(password):
+        digits = run.group()
+        for i in range(len(digits)):
+            for j in range(i + 4, min(len(digits), i + 8) + 1):
+                token = digits[i:j]
+                years = _split_date(token)
+                if years:
+                    matches.append(Match('date', run.start() + i, run.start() + j - 1, token,
+                                         min(_date_guesses(year, False) for year in years)))
+                if len(token) == 4 and 1900 <= int(token) <= 2099:
+                    matches.append(Match('year', run.start() + i, run.start() + j - 1, token,
+                                         max(abs(int(token) - REFERENCE_YEAR), MIN_YEAR_SPACE)))
+    return matches
+
+def _cardinality(password):
+    size = 0
+    if any(c.islower() for c in password):
+        size += 26
+    if any(c.isupper() for c in password):
+        size += 26
+    if any(c.isdigit() for c in password):
+        size += 10
+    if any(not c.isalnum() for c in password):
+        size += 33
+    return max(size, 10)
+
+def find_matches(password, memo=None):
+    matches = []
+    matches += _dictionary_matches(password)
+    matches += _reverse_dictionary_matches(password)
+    matches += _sequence_matches(password)
+    matches += _keyboard_matches(password)
+    matches += _date_matches(password)
+    if len(password) > 2:
+        matches += _repeat_matches(password, {} if memo is None else memo)
+    return matches
+
+def _log2_sum(a, b):
+    high, low = max(a, b), min(a, b)
+    return high + math.log2(1 + 2 ** (low - high))
+
+def _pareto(states):
+    # The final score grows with both sequence length and cost, and every
+    # continuation adds the same to each, so a state that is no shorter and no
+    # cheaper than another can never win. Only states that do not end in brute
+    # force may start a brute-force span, so they are compared among themselves.
+    kept = {}
+    cheapest = cheapest_plain = math.inf
+    for state in sorted(states):
+        cost = states[state][0]
+        if cost < (cheapest if state[1] else cheapest_plain):
+            kept[state] = states[state]
+            cheapest = min(cheapest, cost)
+            if not state[1]:
+                cheapest_plain = min(cheapest_plain, cost)
+    return kept
+
+def _estimate_chunk(analyzed, cardinality, memo):
+    # Minimum-guess decomposition: choose the sequence of non-overlapping
+    # matches (gaps are brute-forced) that minimises
+    #   l! * prod(match guesses) + MIN_GUESSES_BEFORE_GROWING_SEQUENCE ** (l - 1)
+    # memo lives for one estimate_guesses() call, where repeat matching
+    # estimates the same blocks again; it never outlives the password.
+    key = (analyzed, cardinality)
+    if key in memo:
+        return memo[key]
+    n = len(analyzed)
+
+    by_end = [[] for _ in range(n)]
+    for m in find_matches(analyzed, memo):
+        minimum = MIN_SINGLE_CHAR_GUESSES if m.i == m.j else MIN_MULTI_CHAR_GUESSES
+        by_end[m.j].append(m._replace(guesses=max(m.guesses, minimum)))
+
+    # With at least 10 symbols a brute-forced span always costs more than the
+    # minimum guesses, so its cost is just len(span) * log_cardinality
+    log_cardinality = math.log2(max(cardinality, MIN_SINGLE_CHAR_GUESSES))
+    # best[k][(length, ends_in_bruteforce)] = (log2 product, match, previous key);
+    # brute-force spans are stored with match None and rebuilt on the way back
+    best = [{} for _ in range(n)]
+    # Cheapest place to start a brute-force span, per sequence length, as
+    # (cost before the span - start * log_cardinality, previous key)
+    bruteforce_starts = {}
+
+    def consider(k, state, cost, match, previous):
+        current = best[k].get(state)
+        if current is None or cost < current[0]:
+            best[k][state] = (cost, match, previous)
+
+    for k in range(n):
+        # Adjacent brute-force spans are always merged into one, so a span
+        # starting at k follows a match ending at k - 1
+        if k == 0:
+            bruteforce_starts[1] = (0.0, None)
+        else:
+            for (length, bruteforce), (prev_cost, _, _) in best[k - 1].items():
+                start_cost = prev_cost - k * log_cardinality
+                current = bruteforce_starts.get(length + 1)
+                if not bruteforce and (current is None or start_cost < current[0]):
+                    bruteforce_starts[length + 1] = (start_cost, (k - 1, (length, bruteforce)))
+        for m in by_end[k]:
+            cost = math.log2(m.guesses)
+            if m.i == 0:
+                consider(k, (1, False), cost, m, None)
+            else:
+                for (length, bruteforce), (prev_cost, _, _) in best[m.i - 1].items():
+                    consider(k, (length + 1, False), prev_cost + cost, m, (m.i - 1, (length, bruteforce)))
+        for length, (start_cost, previous) in bruteforce_starts.items():
+            consider(k, (length, True), start_cost + (k + 1) * log_cardinality, None, previous)
+        best[k] = _pareto(best[k])
+
+    total, final_state = None, None
+    for state, (cost, _, _) in best[n - 1].items():
+        length = state[0]
+        guesses_log2 = _log2_sum(math.log2(math.factorial(length)) + cost,
+                                 (length - 1) * math.log2(MIN_GUESSES_BEFORE_GROWING_SEQUENCE))
+        if total is None or guesses_log2 < total:
+            total, final_state = guesses_log2, state
+
+    sequence = []
+    position = (n - 1, final_state)
+    while position is not None:
+        k, state = position
+        _, match, previous = best[k][state]
+        if match is None:
+            start = previous[0] + 1 if previous else 0
+            match = Match('bruteforce', start, k, analyzed[start:k + 1], 2 ** ((k + 1 - start) * log_cardinality))
+        sequence.append(match)
+        position = previous
+    sequence.reverse()
+    memo[key] = total, tuple(sequence)
+    return memo[key]
+
+def _period(password):
+    # Shortest block the whole password repeats (a trailing partial block is allowed)
+    for size in range(1, min(len(password) // 2, MAX_ANALYZED_LENGTH) + 1):
+        if password[size:] == password[:-size]:
+            return size
+    return None
+
+def estimate_guesses(password, cardinality=None):
+    if not password:
+        return {'guesses_log2': 0.0, 'sequence': []}
+
+    cardinality = cardinality or _cardinality(password)
+    memo = {}
+    limit = MAX_ANALYZED_LENGTH * MAX_ANALYZED_CHUNKS
+    size = _period(password[:limit]) if len(password) > MAX_ANALYZED_LENGTH else None
+    if size:
+        # One block repeated throughout: guess the block, then the repeat count
+        block = password[:size]
+        count = len(password) / size
+        guesses_log2 = _estimate_chunk(block, cardinality, memo)[0] + math.log2(count)
+        return {'guesses_log2': round(guesses_log2, 2),
+                'sequence': [Match('repeat', 0, len(password) - 1, password, 2 ** guesses_log2)]}
+
+    # Otherwise estimate MAX_ANALYZED_LENGTH chunks. A run of identical chunks
+    # counts as one repeat, so it adds only log2 of its length. Anything past
+    # MAX_ANALYZED_CHUNKS chunks adds nothing.
+    chunks = [password[i:i + MAX_ANALYZED_LENGTH] for i in range(0, min(len(password), limit), MAX_ANALYZED_LENGTH)]
+    total, sequence, offset = 0.0, [], 0
+    for chunk, run in itertools.groupby(chunks):
+        count = len(list(run))
+        guesses_log2, chunk_sequence = _estimate_chunk(chunk, cardinality, memo)
+        total += guesses_log2 + math.log2(count)
+        sequence += [m._replace(i=m.i + offset, j=m.j + offset) for m in chunk_sequence]
+        if count > 1:
+            end = offset + count * len(chunk) - 1
+            sequence.append(Match('repeat', offset, end, password[offset:end + 1], 2 ** guesses_log2 * count))
+        offset += count * len(chunk)
+    return {'guesses_log2': round(total, 2), 'sequence': sequence}
+
+def score_from_entropy(bits):
+    return sum(1 for threshold in SCORE_THRESHOLDS if bits >= threshold)
+
+PATTERN_FEEDBACK = {
+    'dictionary': "Avoid common words, names and passwords",
+    'sequence': "Avoid sequences like 'abc' or '123'",
+    'repeat': "Avoid repeated characters or words",
+    'keyboard': "Avoid keyboard patterns like 'qwerty'",
+    'date': "Avoid dates that are associated with you",
+    'year': "Avoid recent years",
+}
+
+def pattern_feedback(sequence):
+    feedback = []
+    for match in sequence:
+        message = PATTERN_FEEDBACK.get(match.pattern)
+        if message and message not in feedback:
+            feedback.append(message)
+    return feedback
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile a ranked word list into a dictionary trie")
+    parser.add_argument("source", help="word list, one word per line, most common first")
+    parser.add_argument("output", nargs="?", default=DICTIONARY_FILE)
+    args = parser.parse_args(argv)
+
+    count = build_dictionary(args.source, args.output)
+    print(f"  ✓ Compiled {count} words into {args.output}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,31 +1,387 @@
 import hashlib
+import hmac
+import base64
 import secrets
 import string
-from cryptography.fernet import Fernet
+import time
+import json
+import math
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from cryptography.fernet import Fernet, MultiFernet
 import os
-import numpy as np
+from modules.breach_corpus import is_password_breached
+from modules.pattern_entropy import estimate_guesses, score_from_entropy, pattern_feedback
 
 KEY_FILE = "secret.key"
+KEYRING_FILE = "secret.keyring"
+SECRET_KEY_ENV = "TOOLKIT_SECRET_KEY"
+SECRET_KEYRING_ENV = "TOOLKIT_SECRET_KEYRING"
+KEY_FD_ENV = "TOOLKIT_KEY_FD"
+
+HASH_ALGORITHM = os.environ.get("TOOLKIT_HASH_ALGORITHM", "scrypt")
+HASH_WORKERS = int(os.environ.get("TOOLKIT_HASH_WORKERS", "0"))
+SALT_BYTES = 16
+HASH_BYTES = 32
+SCRYPT_MAX_MEMORY = 256 * 1024 * 1024
+BATCH_CRYPTO_WORKERS = 4
+BATCH_PARALLEL_THRESHOLD = 256
+BULK_SCORE_CHUNK_SIZE = 100000
+BULK_SCORE_MAX_LENGTH = 128
+PROFILE_CACHE_SIZE = 256
+# "classes" counts character classes; "patterns" uses the dictionary/pattern estimator
+STRENGTH_MODES = ("classes", "patterns")
+STRENGTH_MODE = os.environ.get("TOOLKIT_STRENGTH_MODE", "classes")
+STRENGTH_CATEGORIES = ["Weak", "Moderate", "Strong", "Very Strong"]
+# Score (0-5) -> index into STRENGTH_CATEGORIES, mirroring check_strength()
+_STRENGTH_CODES = [0, 0, 0, 1, 2, 3]
+# ASCII code points of string.punctuation; code points >= 128 take the scalar path
+_PUNCTUATION_CODES = [ord(c) for c in string.punctuation]
+
+def _open_private(path, mode="w"):
+    # Owner-only (0o600); also tightens a file left over from an earlier run
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.chmod(path, 0o600)
+    return os.fdopen(fd, mode)
 
 def load_key():
     if not os.path.exists(KEY_FILE):
         key = Fernet.generate_key()
-        with open(KEY_FILE, "wb") as f:
+        with _open_private(KEY_FILE, "wb") as f:
             f.write(key)
     with open(KEY_FILE, "rb") as f:
         return f.read()
 
-key = load_key()
-fernet = Fernet(key)
+def save_keyring(keyring):
+    data = {'primary': keyring['primary'],
+            'keys': {str(key_id): key.decode() for key_id, key in keyring['keys'].items()}}
+    tmp_file = KEYRING_FILE + ".tmp"
+    with _open_private(tmp_file) as f:
+        json.dump(data, f)
+    os.replace(tmp_file, KEYRING_FILE)
+
+def load_keyring():
+    # The original single secret.key becomes key ID 1 of the ring
+    if not os.path.exists(KEYRING_FILE):
+        keyring = {'primary': 1, 'keys': {1: load_key()}}
+        save_keyring(keyring)
+        return keyring
+    with open(KEYRING_FILE, "r") as f:
+        return _keyring_from_json(json.load(f))
+
+def _keyring_from_json(data):
+    return {'primary': int(data['primary']),
+            'keys': {int(key_id): key.encode() for key_id, key in data['keys'].items()}}
+
+def parse_keyring(raw):
+    # Either a keyring in the secret.keyring JSON format or a single Fernet key
+    raw = raw.strip()
+    if raw.startswith(b"{"):
+        return _keyring_from_json(json.loads(raw))
+    return {'primary': 1, 'keys': {1: raw}}
+
+class KeyProvider(ABC):
+    name = "none"
+    writable = False
+
+    @abstractmethod
+    def load(self):
+        # Returns the keyring as {'primary': key_id, 'keys': {key_id: key}}
+        raise NotImplementedError
+
+    def save(self, keyring):
+        raise ValueError(f"Key source '{self.name}' is read-only")
+
+class FileKeyProvider(KeyProvider):
+    name = "file"
+    writable = True
+
+    def load(self):
+        return load_keyring()
+
+    def save(self, keyring):
+        save_keyring(keyring)
+
+class EnvKeyProvider(KeyProvider):
+    name = "env"
+
+    def __init__(self, variable):
+        self.variable = variable
+
+    def load(self):
+        return parse_keyring(os.environ[self.variable].encode())
+
+class FdKeyProvider(KeyProvider):
+    name = "fd"
+
+    def __init__(self, fd):
+        self.fd = fd
+        self._raw = None
+
+    def load(self):
+        # A pipe can only be read once, so keep the bytes for later reloads
+        if self._raw is None:
+            with os.fdopen(self.fd, "rb") as f:
+                self._raw = f.read()
+        return parse_keyring(self._raw)
+
+def default_key_provider():
+    if os.environ.get(SECRET_KEYRING_ENV):
+        return EnvKeyProvider(SECRET_KEYRING_ENV)
+    if os.environ.get(SECRET_KEY_ENV):
+        return EnvKeyProvider(SECRET_KEY_ENV)
+    if os.environ.get(KEY_FD_ENV):
+        return FdKeyProvider(int(os.environ[KEY_FD_ENV]))
+    return FileKeyProvider()
+
+# Nothing touches key material until the first encrypt/decrypt call. The
+# installed state is replaced as a whole, so readers never need the lock.
+_key_provider = None
+_keyring_state = None
+_keyring_lock = threading.Lock()
+
+def set_key_provider(provider):
+    global _key_provider, _keyring_state
+    with _keyring_lock:
+        _key_provider = provider
+        _keyring_state = None
+
+def get_key_provider():
+    global _key_provider
+    if _key_provider is None:
+        with _keyring_lock:
+            if _key_provider is None:
+                _key_provider = default_key_provider()
+    return _key_provider
+
+def _install_keyring(ring):
+    global _keyring_state
+    fernets = {key_id: Fernet(k) for key_id, k in ring['keys'].items()}
+    # MultiFernet encrypts with the first key and tries each key on decrypt
+    ordered = [fernets[ring['primary']]] + [f for key_id, f in sorted(fernets.items(), reverse=True)
+                                            if key_id != ring['primary']]
+    _keyring_state = {'ring': ring, 'fernets': fernets, 'fernet': MultiFernet(ordered)}
+
+def _get_keyring():
+    state = _keyring_state
+    if state is None:
+        provider = get_key_provider()
+        with _keyring_lock:
+            if _keyring_state is None:
+                _install_keyring(provider.load())
+            state = _keyring_state
+    return state
+
+def _keyring_with(key_id):
+    # Another process may have rotated to a key this one has not loaded yet,
+    # so an unknown key ID re-reads the ring from the provider once
+    state = _get_keyring()
+    if key_id is not None and key_id not in state['fernets']:
+        provider = get_key_provider()
+        with _keyring_lock:
+            _install_keyring(provider.load())
+            state = _keyring_state
+    return state
+
+def get_primary_key_id():
+    return _get_keyring()['ring']['primary']
+
+def is_keyring_writable():
+    return get_key_provider().writable
+
+def add_key():
+    provider = get_key_provider()
+    if not provider.writable:
+        raise ValueError(f"Key source '{provider.name}' is read-only; add keys where the keyring is managed")
+    with _keyring_lock:
+        ring = provider.load()
+        key_id = max(ring['keys']) + 1
+        ring['keys'][key_id] = Fernet.generate_key()
+        ring['primary'] = key_id
+        provider.save(ring)
+        _install_keyring(ring)
+    return key_id
+
+def _scrypt_digest(password, salt, params):
+    n, r, p = params['n'], params['r'], params['p']
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=2 * 128 * r * (n + p), dklen=HASH_BYTES)
+
+def _pbkdf2_digest(password, salt, params):
+    return hashlib.pbkdf2_hmac('sha256', password.encode(), salt, params['i'], dklen=HASH_BYTES)
+
+# Hash strings are self-describing: "<algorithm>$<k=v,...>$<salt>$<digest>",
+# so stored rows keep verifying after the defaults below change.
+HASHERS = {
+    'scrypt': _scrypt_digest,
+    'pbkdf2_sha256': _pbkdf2_digest,
+}
+HASH_PARAMS = {
+    'scrypt': {'n': 2 ** 14, 'r': 8, 'p': 1},
+    'pbkdf2_sha256': {'i': 600000},
+}
+
+def register_hasher(name, digest_func, params):
+    HASHERS[name] = digest_func
+    HASH_PARAMS[name] = dict(params)
+
+def configure_hasher(algorithm, params=None):
+    global HASH_ALGORITHM
+    if algorithm not in HASHERS:
+        raise ValueError(f"Unknown hash algorithm: {algorithm}")
+    HASH_ALGORITHM = algorithm
+    if params:
+        HASH_PARAMS[algorithm] = dict(params)
+
+def _b64encode(data):
+    return base64.b64encode(data).decode().rstrip("=")
+
+def _b64decode(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+def _format_params(params):
+    return ",".join(f"{k}={v}" for k, v in params.items())
+
+def _parse_params(text):
+    return {k: int(v) for k, v in (item.split("=", 1) for item in text.split(",") if item)}
+
+def is_legacy_hash(stored):
+    return len(stored) == 64 and "$" not in stored
+
+def _compute_hash(password, algorithm, params):
+    salt = secrets.token_bytes(SALT_BYTES)
+    digest = HASHERS[algorithm](password, salt, params)
+    return f"{algorithm}${_format_params(params)}${_b64encode(salt)}${_b64encode(digest)}"
+
+def _check_hash(password, stored):
+    if is_legacy_hash(stored):
+        return hmac.compare_digest(hash_password_legacy(password), stored)
+    try:
+        algorithm, params, salt, digest = stored.split("$")
+        hasher = HASHERS[algorithm]
+        expected = _b64decode(digest)
+        actual = hasher(password, _b64decode(salt), _parse_params(params))
+    except (ValueError, KeyError):
+        return False
+    return hmac.compare_digest(actual, expected)
+
+_hash_pool = None
+
+def get_hash_pool():
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ProcessPoolExecutor(max_workers=HASH_WORKERS)
+    return _hash_pool
+
+def shutdown_hash_pool():
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown()
+        _hash_pool = None
 
-def hash_password(password):
+def _run_hasher(func, *args):
+    # Offload to worker processes so concurrent logins use every core
+    if HASH_WORKERS > 0:
+        return get_hash_pool().submit(func, *args).result()
+    return func(*args)
+
+def hash_password_legacy(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
+def hash_password(password, algorithm=None):
+    algorithm = algorithm or HASH_ALGORITHM
+    return _run_hasher(_compute_hash, password, algorithm, HASH_PARAMS[algorithm])
+
+def verify_password(password, stored):
+    if not stored:
+        return False
+    return _run_hasher(_check_hash, password, stored)
+
+def needs_rehash(stored):
+    if is_legacy_hash(stored):
+        return True
+    algorithm, params = stored.split("$", 2)[:2]
+    if algorithm != HASH_ALGORITHM:
+        return True
+    return _parse_params(params) != HASH_PARAMS[algorithm]
+
+def calibrate_hasher(target_ms=250, algorithm=None, apply=True):
+    algorithm = algorithm or HASH_ALGORITHM
+    salt = secrets.token_bytes(SALT_BYTES)
+    
+    def measure(params):
+        start = time.perf_counter()
+        HASHERS[algorithm]("calibration-password", salt, params)
+        return (time.perf_counter() - start) * 1000
+    
+    if algorithm == 'scrypt':
+        # Double the memory cost until the target is met; once the memory
+        # ceiling is reached, raise parallelism instead.
+        params = {'n': 2 ** 10, 'r': 8, 'p': 1}
+        while measure(params) < target_ms:
+            if 128 * params['r'] * params['n'] * 2 <= SCRYPT_MAX_MEMORY:
+                params['n'] *= 2
+            else:
+                params['p'] += 1
+    elif algorithm == 'pbkdf2_sha256':
+        params = {'i': 10000}
+        elapsed = measure(params)
+        while elapsed < target_ms:
+            # Iteration cost is linear, so scale straight towards the target
+            # (with a little headroom so timing noise can't stall the loop)
+            params['i'] = int(params['i'] * min(target_ms / max(elapsed, 0.01), 10) * 1.05)
+            elapsed = measure(params)
+    else:
+        raise ValueError(f"Calibration not supported for: {algorithm}")
+    
+    if apply:
+        configure_hasher(algorithm, params)
+    return params
+
 def encrypt_password(password):
-    return fernet.encrypt(password.encode()).decode()
+    return _get_keyring()['fernet'].encrypt(password.encode()).decode()
+
+def encrypt_password_with_key_id(password, key_id=None):
+    state = _keyring_with(key_id)
+    key_id = state['ring']['primary'] if key_id is None else key_id
+    return state['fernets'][key_id].encrypt(password.encode()).decode(), key_id
+
+def decrypt_password(encrypted, key_id=None):
+    # Rows without a recorded key ID fall back to trying every key in the ring
+    state = _keyring_with(key_id)
+    cipher = state['fernets'].get(key_id, state['fernet'])
+    return cipher.decrypt(encrypted.encode()).decode()
 
-def decrypt_password(encrypted):
-    return fernet.decrypt(encrypted.encode()).decode()
+def reencrypt_password(encrypted, key_id, target_key_id):
+    return _keyring_with(target_key_id)['fernets'][target_key_id].encrypt(
+        decrypt_password(encrypted, key_id).encode()).decode()
+
+def _map_in_chunks(func, items, workers):
+    items = list(items)
+    workers = BATCH_CRYPTO_WORKERS if workers is None else workers
+    if workers <= 1 or len(items) < BATCH_PARALLEL_THRESHOLD:
+        return [func(item) for item in items]
+    # One contiguous chunk per worker keeps results in input order
+    size = -(-len(items) // workers)
+    chunks = [items[i:i + size] for i in range(0, len(items), size)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        parts = executor.map(lambda chunk: [func(item) for item in chunk], chunks)
+        return [result for part in parts for result in part]
+
+def encrypt_many(passwords, key_id=None, workers=None):
+    key_id = get_primary_key_id() if key_id is None else key_id
+    return _map_in_chunks(lambda password: encrypt_password_with_key_id(password, key_id)[0], passwords, workers)
+
+def decrypt_many(tokens, key_ids=None, workers=None):
+    if key_ids is None:
+        return _map_in_chunks(decrypt_password, tokens, workers)
+    return _map_in_chunks(lambda pair: decrypt_password(*pair), zip(tokens, key_ids), workers)
+
+def reencrypt_many(tokens, key_ids, target_key_id, workers=None):
+    return _map_in_chunks(lambda pair: reencrypt_password(pair[0], pair[1], target_key_id),
+                          zip(tokens, key_ids), workers)
 
 def generate_password(length=12, use_special=True, use_numbers=True, use_uppercase=True, use_lowercase=True):
     chars = ""
@@ -43,34 +399,115 @@ def generate_password(length=12, use_special=True, use_numbers=True, use_upperca
     
     return ''.join(secrets.choice(chars) for _ in range(length))
 
-def check_strength(password):
+_PUNCTUATION = frozenset(string.punctuation)
+
+class PasswordProfile:
+    # Character-class analysis of one password, computed in a single scan
+    __slots__ = ('length', 'has_lower', 'has_upper', 'has_digit', 'has_special')
+
+    def __init__(self, password):
+        self.length = len(password)
+        lower = upper = digit = special = False
+        for c in password:
+            if c in _PUNCTUATION:
+                special = True
+            elif c.isdigit():
+                digit = True
+            elif c.islower():
+                lower = True
+            elif c.isupper():
+                upper = True
+            if lower and upper and digit and special:
+                break
+        self.has_lower = lower
+        self.has_upper = upper
+        self.has_digit = digit
+        self.has_special = special
+
+    @property
+    def charset_size(self):
+        return (26 * self.has_lower + 26 * self.has_upper + 10 * self.has_digit
+                + len(string.punctuation) * self.has_special)
+
+    @property
+    def entropy(self):
+        size = self.charset_size
+        return round(self.length * math.log2(size), 2) if size > 0 else 0
+
+# Cache keys are keyed BLAKE2 digests so no plaintext password is retained
+_PROFILE_CACHE_KEY = secrets.token_bytes(32)
+_analysis_cache = OrderedDict()
+_analysis_cache_lock = threading.Lock()
+
+def _memoized(kind, password, compute):
+    digest = hashlib.blake2b(password.encode('utf-8', 'surrogatepass'), digest_size=16,
+                             key=_PROFILE_CACHE_KEY).digest()
+    key = (kind, digest)
+    with _analysis_cache_lock:
+        result = _analysis_cache.get(key)
+        if result is not None:
+            _analysis_cache.move_to_end(key)
+            return result
+    
+    result = compute(password)
+    with _analysis_cache_lock:
+        _analysis_cache[key] = result
+        if len(_analysis_cache) > PROFILE_CACHE_SIZE:
+            _analysis_cache.popitem(last=False)
+    return result
+
+def get_password_profile(password):
+    return _memoized('profile', password, PasswordProfile)
+
+def _estimate_patterns(password):
+    estimate = estimate_guesses(password, get_password_profile(password).charset_size)
+    # Keep only the score and hints; the matched tokens are password fragments
+    return estimate['guesses_log2'], tuple(pattern_feedback(estimate['sequence']))
+
+def get_pattern_estimate(password):
+    return _memoized('patterns', password, _estimate_patterns)
+
+def check_strength(password, mode=None):
+    mode = mode or STRENGTH_MODE
+    profile = get_password_profile(password)
     score = 0
     feedback = []
     
-    if any(c.islower() for c in password):
+    if profile.has_lower:
         score += 1
     else:
         feedback.append("Add lowercase letters")
     
-    if any(c.isupper() for c in password):
+    if profile.has_upper:
         score += 1
     else:
         feedback.append("Add uppercase letters")
     
-    if any(c.isdigit() for c in password):
+    if profile.has_digit:
         score += 1
     else:
         feedback.append("Add numbers")
     
-    if any(c in string.punctuation for c in password):
+    if profile.has_special:
         score += 1
     else:
         feedback.append("Add special characters")
     
-    if len(password) >= 12:
+    if profile.length >= 12:
         score += 1
     else:
-        feedback.append(f"Increase length (current: {len(password)}, recommended: 12+)")
+        feedback.append(f"Increase length (current: {profile.length}, recommended: 12+)")
+    
+    if mode == "patterns":
+        bits, hints = get_pattern_estimate(password) if password else (0, ())
+        score = score_from_entropy(bits)
+        feedback = list(hints) + (feedback if score < 5 else [])
+    
+    # A leaked password is weak no matter how many character classes it uses
+    breached = is_password_breached(password)
+    if breached:
+        score = min(score, 2)
+        feedback.insert(0, "This password appears in a known data breach - choose another")
     
     if score <= 2:
         strength = "Weak"
@@ -91,31 +528,23 @@ def check_strength(password):
         'max_score': 5,
         'percentage': (score / 5) * 100,
         'feedback': feedback,
-        'color': color
+        'color': color,
+        'breached': breached
     }
 
-def analyze_password_entropy(password):
+def analyze_password_entropy(password, mode=None):
     if not password:
         return 0
     
-    char_set_size = 0
-    if any(c.islower() for c in password):
-        char_set_size += 26
-    if any(c.isupper() for c in password):
-        char_set_size += 26
-    if any(c.isdigit() for c in password):
-        char_set_size += 10
-    if any(c in string.punctuation for c in password):
-        char_set_size += len(string.punctuation)
-    
-    entropy = len(password) * np.log2(char_set_size) if char_set_size > 0 else 0
-    return round(entropy, 2)
-
-def compare_passwords(password1, password2):
-    strength1 = check_strength(password1)
-    strength2 = check_strength(password2)
-    entropy1 = analyze_password_entropy(password1)
-    entropy2 = analyze_password_entropy(password2)
+    if (mode or STRENGTH_MODE) == "patterns":
+        return get_pattern_estimate(password)[0]
+    return get_password_profile(password).entropy
+
+def compare_passwords(password1, password2, mode=None):
+    strength1 = check_strength(password1, mode)
+    strength2 = check_strength(password2, mode)
+    entropy1 = analyze_password_entropy(password1, mode)
+    entropy2 = analyze_password_entropy(password2, mode)
     
     return {
         'password1': {
@@ -131,6 +560,81 @@ def compare_passwords(password1, password2):
         'recommendation': 'Password 1' if strength1['score'] >= strength2['score'] else 'Password 2'
     }
 
+def _score_chunk(passwords):
+    import numpy as np
+    
+    punctuation_table = np.zeros(129, dtype=bool)
+    punctuation_table[_PUNCTUATION_CODES] = True
+    # A fixed-width array pads every row to the longest password and numpy drops
+    # trailing NULs, so long outliers and passwords containing NUL skip it
+    vectorized = np.fromiter((len(p) <= BULK_SCORE_MAX_LENGTH and "\x00" not in p for p in passwords),
+                             dtype=bool, count=len(passwords))
+    arr = np.array([p for p, v in zip(passwords, vectorized) if v], dtype=np.str_)
+    width = arr.dtype.itemsize // 4
+    # View the fixed-width UTF-32 buffer as a 2-D grid of code points (0 = padding)
+    codes = arr.view(np.uint32).reshape(len(arr), width) if width else np.zeros((len(arr), 0), np.uint32)
+    
+    n = len(passwords)
+    lengths = np.zeros(n, dtype=np.int64)
+    has_lower = np.zeros(n, dtype=bool)
+    has_upper = np.zeros(n, dtype=bool)
+    has_digit = np.zeros(n, dtype=bool)
+    has_special = np.zeros(n, dtype=bool)
+    scalar = ~vectorized
+    lengths[vectorized] = np.char.str_len(arr)
+    has_lower[vectorized] = ((codes >= 97) & (codes <= 122)).any(axis=1)
+    has_upper[vectorized] = ((codes >= 65) & (codes <= 90)).any(axis=1)
+    has_digit[vectorized] = ((codes >= 48) & (codes <= 57)).any(axis=1)
+    has_special[vectorized] = punctuation_table[np.minimum(codes, 128)].any(axis=1)
+    scalar[vectorized] = (codes > 127).any(axis=1)
+    
+    score = (has_lower.astype(np.int8) + has_upper + has_digit + has_special + (lengths >= 12))
+    charset = 26 * has_lower + 26 * has_upper + 10 * has_digit + len(string.punctuation) * has_special
+    with np.errstate(divide='ignore'):
+        entropy = np.where(charset > 0, lengths * np.log2(np.maximum(charset, 1)), 0.0).round(2)
+    
+    # Unicode letters/digits need str.islower() & co. to match check_strength exactly;
+    # the passwords kept out of the array are profiled the same way
+    for i in np.flatnonzero(scalar):
+        profile = PasswordProfile(passwords[i])
+        lengths[i] = profile.length
+        has_lower[i] = profile.has_lower
+        has_upper[i] = profile.has_upper
+        has_digit[i] = profile.has_digit
+        has_special[i] = profile.has_special
+        score[i] = (profile.has_lower + profile.has_upper + profile.has_digit + profile.has_special
+                    + (profile.length >= 12))
+        entropy[i] = profile.entropy
+    
+    return {
+        'length': lengths,
+        'has_lower': has_lower,
+        'has_upper': has_upper,
+        'has_digit': has_digit,
+        'has_special': has_special,
+        'score': score,
+        'entropy': entropy,
+    }
+
+def score_passwords(passwords, chunk_size=BULK_SCORE_CHUNK_SIZE):
+    import numpy as np
+    import pandas as pd
+    
+    passwords = list(passwords)
+    columns = {}
+    for start in range(0, len(passwords), chunk_size):
+        for name, values in _score_chunk(passwords[start:start + chunk_size]).items():
+            columns.setdefault(name, []).append(values)
+    
+    if not columns:
+        return pd.DataFrame(columns=['length', 'has_lower', 'has_upper', 'has_digit', 'has_special',
+                                     'score', 'strength', 'entropy'])
+    
+    df = pd.DataFrame({name: np.concatenate(parts) for name, parts in columns.items()})
+    df['strength'] = pd.Categorical.from_codes(np.array(_STRENGTH_CODES, dtype=np.int8)[df['score'].to_numpy()],
+                                               STRENGTH_CATEGORIES)
+    return df[['length', 'has_lower', 'has_upper', 'has_digit', 'has_special', 'score', 'strength', 'entropy']]
+
 def generate_multiple_passwords(count=5, length=12):
     passwords = []
     for _ in range(count):
@@ -145,21 +649,22 @@ def generate_multiple_passwords(count=5, length=12):
     return passwords
 
 def validate_password_requirements(password, min_length=8, require_upper=True, require_lower=True, require_digit=True, require_special=True):
+    profile = get_password_profile(password)
     errors = []
     
-    if len(password) < min_length:
+    if profile.length < min_length:
         errors.append(f"Password must be at least {min_length} characters")
     
-    if require_upper and not any(c.isupper() for c in password):
+    if require_upper and not profile.has_upper:
         errors.append("Password must contain uppercase letters")
     
-    if require_lower and not any(c.islower() for c in password):
+    if require_lower and not profile.has_lower:
         errors.append("Password must contain lowercase letters")
     
-    if require_digit and not any(c.isdigit() for c in password):
+    if require_digit and not profile.has_digit:
         errors.append("Password must contain digits")
     
-    if require_special and not any(c in string.punctuation for c in password):
+    if require_special and not profile.has_special:
         errors.append("Password must contain special characters")
     
     return {
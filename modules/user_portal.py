@@ -1,16 +1,18 @@
+import os
 import sys
-import pandas as pd
-import numpy as np
 from modules.database import (add_user, get_user, get_user_by_name, add_password, 
-                               get_passwords, get_passwords_dataframe, update_password, 
+                               get_vault_entries, decrypt_entries, update_password, 
                                delete_password, add_feedback, lock_user_account, 
                                request_account_unlock, add_audit_request)
 from modules.security_utils import (generate_password, check_strength, analyze_password_entropy,
                                      compare_passwords, generate_multiple_passwords, 
                                      validate_password_requirements)
+from modules.breach_corpus import is_password_breached
 from modules.activity_logger import log_action
 from modules.database import get_user_completed_audits
-from modules.activity_logger import get_user_activity_summary, get_logs_dataframe
+from modules.activity_logger import get_user_activity_summary, get_user_events
+from modules.event_types import EventType
+from modules.vault_transfer import import_vault, export_vault, detect_format
 
 
 
@@ -41,8 +43,12 @@ def register():
     strength = check_strength(password)
     print(f"\n  Password Strength: {strength['color']} {strength['strength']} ({strength['score']}/5)")
     
-    if strength['score'] < 3:
+    if strength['breached']:
+        print("  ⚠ Warning: This password appears in a known data breach!")
+    elif strength['score'] < 3:
         print("  ⚠ Warning: Weak password detected!")
+    
+    if strength['score'] < 3:
         print("  Suggestions:")
         for suggestion in strength['feedback']:
             print(f"    • {suggestion}")
@@ -66,7 +72,7 @@ def register():
         print("\n  ✓ Registration successful!")
         print("  ⏳ Your account is pending admin approval")
         print("  You will be able to login once approved")
-        log_action(username, "Registered - Pending approval")
+        log_action(username, "Registered - Pending approval", EventType.REGISTRATION)
     else:
         print("\n  ✗ Registration failed")
     
@@ -92,7 +98,7 @@ def login():
             reason = input("  Reason for unlock request: ").strip()
             request_account_unlock(user[0], username, reason)
             print("\n  ✓ Unlock request submitted")
-            log_action(username, "Requested account unlock")
+            log_action(username, "Requested account unlock", EventType.UNLOCK_REQUESTED)
         
         input("\n  Press Enter to continue...")
         return None
@@ -105,25 +111,34 @@ def login():
     
     print(f"\n  ✓ Login successful")
     print(f"  Welcome back, {username}!")
-    log_action(username, "Logged in")
+    log_action(username, "Logged in", EventType.LOGIN)
     input("\n  Press Enter to continue...")
     user_menu(user[0], username)
 
-def display_passwords_table(passwords_df):
-    if passwords_df.empty:
+def display_passwords_table(entries, show_passwords=True):
+    if not entries:
         print("  No passwords saved yet")
         return
     
+    if show_passwords:
+        decrypt_entries(entries)
+    
     print_separator("-")
-    print(f"  {'ID':<8} {'LABEL':<30} {'PASSWORD':<40}")
+    if show_passwords:
+        print(f"  {'ID':<8} {'LABEL':<30} {'PASSWORD':<40}")
+    else:
+        print(f"  {'ID':<8} {'LABEL':<30}")
     print_separator("-")
     
-    for _, row in passwords_df.iterrows():
-        masked_pwd = '*' * 8 + row['Password'][-4:] if len(row['Password']) > 4 else '*' * len(row['Password'])
-        print(f"  {row['ID']:<8} {row['Label']:<30} {masked_pwd:<40}")
+    for entry in entries:
+        if show_passwords:
+            masked_pwd = '*' * 8 + entry.password[-4:] if len(entry.password) > 4 else '*' * len(entry.password)
+            print(f"  {entry.id:<8} {entry.label:<30} {masked_pwd:<40}")
+        else:
+            print(f"  {entry.id:<8} {entry.label:<30}")
     
     print_separator("-")
-    print(f"\n  Total Passwords Stored: {len(passwords_df)}")
+    print(f"\n  Total Passwords Stored: {len(entries)}")
 
 def add_password_menu(user_id, username):
     print_header("ADD NEW PASSWORD")
@@ -138,6 +153,13 @@ def add_password_menu(user_id, username):
     
     if choice == "1":
         pwd = input("\n  Password: ").strip()
+        
+        if is_password_breached(pwd):
+            print("\n  ⚠ Warning: This password appears in a known data breach!")
+            confirm = input("  Save it anyway? [Y/N]: ").strip().upper()
+            if confirm != "Y":
+                print("\n  Password not saved")
+                return
     elif choice == "2":
         print("\n  PASSWORD GENERATOR OPTIONS:")
         print_separator("-")
@@ -157,19 +179,19 @@ def add_password_menu(user_id, username):
     
     add_password(user_id, label, pwd)
     print("\n  ✓ Password saved successfully")
-    log_action(username, f"Added password for {label}")
+    log_action(username, f"Added password for {label}", EventType.PASSWORD_ADDED)
 
 def view_passwords_menu(user_id, username):
     print_header("SAVED PASSWORDS")
     
-    passwords_df = get_passwords_dataframe(user_id)
+    entries = get_vault_entries(user_id)
     
-    if passwords_df.empty:
+    if not entries:
         print("  No passwords saved yet")
-        log_action(username, "Viewed saved passwords (empty)")
+        log_action(username, "Viewed saved passwords (empty)", EventType.PASSWORD_VIEWED)
         return
     
-    display_passwords_table(passwords_df)
+    display_passwords_table(entries)
     
     show_full = input("\n  Show full passwords? [Y/N]: ").strip().upper()
     
@@ -178,30 +200,30 @@ def view_passwords_menu(user_id, username):
         print(f"  {'ID':<8} {'LABEL':<30} {'PASSWORD':<40}")
         print_separator("-")
         
-        for _, row in passwords_df.iterrows():
-            print(f"  {row['ID']:<8} {row['Label']:<30} {row['Password']:<40}")
+        for entry in entries:
+            print(f"  {entry.id:<8} {entry.label:<30} {entry.password:<40}")
         
         print_separator("-")
     
-    log_action(username, "Viewed saved passwords")
+    log_action(username, "Viewed saved passwords", EventType.PASSWORD_VIEWED)
 
 def update_password_menu(user_id, username):
     print_header("UPDATE PASSWORD")
     
-    passwords_df = get_passwords_dataframe(user_id)
+    entries = get_vault_entries(user_id)
     
-    if passwords_df.empty:
+    if not entries:
         print("  No passwords to update")
         return
     
-    display_passwords_table(passwords_df)
+    display_passwords_table(entries, show_passwords=False)
     
     rid = input("\n  Enter ID to update (or 0 to cancel): ").strip()
     
     if rid == "0":
         return
     
-    if not rid.isdigit() or int(rid) not in passwords_df['ID'].values:
+    if not rid.isdigit() or int(rid) not in {entry.id for entry in entries}:
         print("\n  ✗ Invalid ID")
         return
     
@@ -215,27 +237,27 @@ def update_password_menu(user_id, username):
     if confirm == "Y":
         update_password(int(rid), new_pwd)
         print("\n  ✓ Password updated successfully")
-        log_action(username, f"Updated password ID {rid}")
+        log_action(username, f"Updated password ID {rid}", EventType.PASSWORD_UPDATED)
     else:
         print("\n  Update cancelled")
 
 def delete_password_menu(user_id, username):
     print_header("DELETE PASSWORD")
     
-    passwords_df = get_passwords_dataframe(user_id)
+    entries = get_vault_entries(user_id)
     
-    if passwords_df.empty:
+    if not entries:
         print("  No passwords to delete")
         return
     
-    display_passwords_table(passwords_df)
+    display_passwords_table(entries, show_passwords=False)
     
     rid = input("\n  Enter ID to delete (or 0 to cancel): ").strip()
     
     if rid == "0":
         return
     
-    if not rid.isdigit() or int(rid) not in passwords_df['ID'].values:
+    if not rid.isdigit() or int(rid) not in {entry.id for entry in entries}:
         print("\n  ✗ Invalid ID")
         return
     
@@ -244,10 +266,55 @@ def delete_password_menu(user_id, username):
     if confirm == "Y":
         delete_password(int(rid))
         print("\n  ✓ Password deleted successfully")
-        log_action(username, f"Deleted password ID {rid}")
+        log_action(username, f"Deleted password ID {rid}", EventType.PASSWORD_DELETED)
     else:
         print("\n  Deletion cancelled")
 
+def import_export_menu(user_id, username):
+    print_header("IMPORT / EXPORT PASSWORDS")
+    
+    print("  [1] Import from CSV, JSON or JSON Lines (toolkit, Chrome, Firefox, Bitwarden exports)")
+    print("  [2] Export vault to an encrypted file")
+    print_separator("-")
+    
+    choice = input("\n  Choose: ").strip()
+    
+    if choice == "1":
+        path = input("\n  File to import: ").strip()
+        if not os.path.isfile(path):
+            print("\n  ✗ File not found")
+            return
+        
+        fmt = detect_format(path)
+        passphrase = input("  Export passphrase: ").strip() if fmt == "export" else None
+        
+        try:
+            result = import_vault(user_id, path, passphrase, fmt,
+                                  progress=lambda count: print(f"  ... {count} passwords imported"))
+        except ValueError as e:
+            print(f"\n  ✗ {e}")
+            return
+        
+        print(f"\n  ✓ Imported {result['imported']} passwords")
+        if result['skipped']:
+            print(f"  {result['skipped']} rows had no password and were skipped")
+        if result['breached']:
+            print(f"  ⚠ {result['breached']} imported passwords appear in a known data breach")
+        log_action(username, f"Imported {result['imported']} passwords ({result['format']})", EventType.PASSWORD_ADDED)
+    elif choice == "2":
+        path = input("\n  Export file: ").strip()
+        passphrase = input("  Passphrase to protect the export: ").strip()
+        if len(passphrase) < 8:
+            print("\n  ✗ Passphrase must be at least 8 characters")
+            return
+        
+        count = export_vault(user_id, path, passphrase)
+        print(f"\n  ✓ Exported {count} passwords to {path}")
+        print("  Keep the passphrase: it is needed to import this file again")
+        log_action(username, f"Exported vault ({count} passwords)", EventType.PASSWORD_VIEWED)
+    else:
+        print("\n  ✗ Invalid choice")
+
 def generate_password_menu(username):
     print_header("PASSWORD GENERATOR")
     
@@ -267,7 +334,7 @@ def generate_password_menu(username):
         print(f"  Strength: {strength['color']} {strength['strength']} ({strength['score']}/5)")
         print(f"  Entropy: {entropy} bits")
         
-        log_action(username, "Generated single password")
+        log_action(username, "Generated single password", EventType.PASSWORD_GENERATED)
         
     elif choice == "2":
         count = input("\n  How many passwords to generate? (default 5): ").strip()
@@ -287,7 +354,7 @@ def generate_password_menu(username):
             print(f"  {pwd_info['password']:<30} {pwd_info['strength']:<15} {pwd_info['entropy']:<15}")
         
         print_separator("-")
-        log_action(username, f"Generated {count} passwords")
+        log_action(username, f"Generated {count} passwords", EventType.PASSWORD_GENERATED)
         
     elif choice == "3":
         length = input("\n  Length (default 12): ").strip()
@@ -306,13 +373,14 @@ def generate_password_menu(username):
         print(f"  Strength: {strength['color']} {strength['strength']} ({strength['score']}/5)")
         print(f"  Entropy: {entropy} bits")
         
-        log_action(username, "Generated custom password")
+        log_action(username, "Generated custom password", EventType.PASSWORD_GENERATED)
 
 def check_password_strength_menu(username):
     print_header("PASSWORD STRENGTH CHECKER")
     
     print("  [1] Check single password")
     print("  [2] Compare two passwords")
+    print("  [3] Pattern-aware analysis (words, keyboard walks, dates)")
     print_separator("-")
     
     choice = input("\n  Choose: ").strip()
@@ -335,7 +403,7 @@ def check_password_strength_menu(username):
                 print(f"    • {suggestion}")
         
         print_separator("-")
-        log_action(username, "Checked password strength")
+        log_action(username, "Checked password strength", EventType.STRENGTH_CHECKED)
         
     elif choice == "2":
         pwd1 = input("\n  Enter first password: ").strip()
@@ -358,7 +426,27 @@ def check_password_strength_menu(username):
         print(f"  Recommendation: {comparison['recommendation']} is stronger")
         print_separator("-")
         
-        log_action(username, "Compared two passwords")
+        log_action(username, "Compared two passwords", EventType.STRENGTH_CHECKED)
+        
+    elif choice == "3":
+        pwd = input("\n  Enter password to analyze: ").strip()
+        
+        strength = check_strength(pwd, mode="patterns")
+        entropy = analyze_password_entropy(pwd, mode="patterns")
+        
+        print("\n  PATTERN-AWARE ANALYSIS:")
+        print_separator("-")
+        print(f"  Strength: {strength['color']} {strength['strength']}")
+        print(f"  Score: {strength['score']}/5 ({strength['percentage']:.0f}%)")
+        print(f"  Estimated Guesses: 2^{entropy} ({entropy} bits)")
+        
+        if strength['feedback']:
+            print("\n  SUGGESTIONS FOR IMPROVEMENT:")
+            for suggestion in strength['feedback']:
+                print(f"    • {suggestion}")
+        
+        print_separator("-")
+        log_action(username, "Checked password strength (pattern-aware)", EventType.STRENGTH_CHECKED)
 
 def submit_feedback_menu(user_id, username):
     print_header("SUBMIT FEEDBACK")
@@ -372,7 +460,7 @@ def submit_feedback_menu(user_id, username):
     add_feedback(user_id, username, feedback)
     print("\n  ✓ Feedback submitted successfully")
     print("  Thank you for your feedback!")
-    log_action(username, "Submitted feedback")
+    log_action(username, "Submitted feedback", EventType.FEEDBACK_SUBMITTED)
 
 def lock_account_menu(user_id, username):
     print_header("LOCK ACCOUNT")
@@ -393,7 +481,7 @@ def lock_account_menu(user_id, username):
     lock_user_account(user_id, username, reason)
     print("\n  ✓ Account locked successfully")
     print("  You can request unlock from login screen")
-    log_action(username, "Locked own account")
+    log_action(username, "Locked own account", EventType.ACCOUNT_LOCKED)
     input("\n  Press Enter to continue...")
     sys.exit(0)
 
@@ -413,7 +501,7 @@ def request_audit_menu(user_id, username):
         add_audit_request(user_id, username)
         print("\n  ✓ Audit request submitted")
         print("  Admin will review and provide summary")
-        log_action(username, "Requested account audit")
+        log_action(username, "Requested account audit", EventType.AUDIT_REQUESTED)
     else:
         print("\n  Request cancelled")
 
@@ -437,9 +525,7 @@ def view_my_audit_summary(user_id, username):
         return
 
     audit_id = int(choice)
-    df = get_logs_dataframe()
-    user_logs = df[df['Username'] == username]
-    log_row = user_logs[user_logs['Action'].str.contains(f"Account audit completed by Admin", case=False, na=False)]
+    log_row = get_user_events(username, EventType.AUDIT_COMPLETED)
     if log_row.empty:
         print("\n  No detailed report found for this audit.")
         return
@@ -458,7 +544,7 @@ def view_my_audit_summary(user_id, username):
     print_separator("=")
 
     print("\n  NOTE: This audit data is live, generated from your latest activity logs.")
-    log_action(username, f"Viewed completed audit ID {audit_id}")
+    log_action(username, f"Viewed completed audit ID {audit_id}", EventType.AUDIT_VIEWED)
 
 
 def view_audit_reports_menu(user_id, username):
@@ -479,9 +565,7 @@ def view_audit_reports_menu(user_id, username):
         print(f"  {audit[0]:<6} {audit[1]:<20} {audit[2]:<12}")
     print_separator("-")
     
-    from modules.activity_logger import get_logs_dataframe
-    df = get_logs_dataframe()
-    user_logs = df[(df['Username'] == username) & (df['Action'].str.contains("Account audit completed", case=False))]
+    user_logs = get_user_events(username, EventType.AUDIT_COMPLETED)
     
     if not user_logs.empty:
         print("\n  COMPLETED AUDITS SUMMARY:")
@@ -492,7 +576,7 @@ def view_audit_reports_menu(user_id, username):
     else:
         print("\n  No completed audit summaries yet.")
     
-    log_action(username, "Viewed audit reports")
+    log_action(username, "Viewed audit reports", EventType.AUDIT_VIEWED)
 
     
 
@@ -514,7 +598,8 @@ def user_menu(user_id, username):
         print("    [8]  Request Account Audit")
         print("    [9]  View My Audit Reports")
         print("    [10] Lock Account")
-        print("    [11] Logout")
+        print("    [11] Import / Export Passwords")
+        print("    [12] Logout")
         print()
         print_separator("-")
         
@@ -541,7 +626,9 @@ def user_menu(user_id, username):
         elif choice == "10":
             lock_account_menu(user_id, username)
         elif choice == "11":
-            log_action(username, "Logged out")
+            import_export_menu(user_id, username)
+        elif choice == "12":
+            log_action(username, "Logged out", EventType.LOGOUT)
             print("\n  ✓ Logged out successfully")
             input("\n  Press Enter to continue...")
             break
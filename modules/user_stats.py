@@ -0,0 +1,51 @@
+import sys
+import argparse
+from modules.database import get_connection, initialize_database, USER_STATS_COLUMNS, USER_STATS_SQL
+
+def _load(sql):
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(sql)
+        # Users with nothing to count have no row, or a row of zeros
+        return {row[0]: tuple(row[1:]) for row in c.fetchall() if any(row[1:])}
+
+def find_user_stats_drift():
+    stored = _load(f"SELECT user_id, {', '.join(USER_STATS_COLUMNS)} FROM user_stats")
+    live = _load(USER_STATS_SQL)
+    zeros = (0,) * len(USER_STATS_COLUMNS)
+    drift = []
+    for user_id in sorted(stored.keys() | live.keys()):
+        for column, have, want in zip(USER_STATS_COLUMNS, stored.get(user_id, zeros), live.get(user_id, zeros)):
+            if have != want:
+                drift.append((user_id, column, have, want))
+    return drift
+
+def rebuild_user_stats():
+    with get_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM user_stats")
+        conn.execute(f"INSERT INTO user_stats (user_id, {', '.join(USER_STATS_COLUMNS)}) {USER_STATS_SQL}")
+        return conn.execute("SELECT COUNT(*) FROM user_stats").fetchone()[0]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the trigger-maintained user_stats table against the base tables")
+    parser.add_argument("--rebuild", action="store_true", help="recompute user_stats from the base tables")
+    args = parser.parse_args(argv)
+
+    initialize_database()
+    if args.rebuild:
+        count = rebuild_user_stats()
+        print(f"  ✓ Rebuilt user_stats for {count} users")
+        return 0
+
+    drift = find_user_stats_drift()
+    if not drift:
+        print("  ✓ user_stats matches the base tables")
+        return 0
+    for user_id, column, stored, actual in drift:
+        print(f"  user {user_id}: {column} is {stored}, expected {actual}")
+    print(f"\n  ⚠ {len(drift)} mismatched counters; run with --rebuild to repair")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
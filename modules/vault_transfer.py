@@ -0,0 +1,216 @@
+import os
+import sys
+import csv
+import json
+import base64
+import binascii
+import hashlib
+import secrets
+import argparse
+from cryptography.fernet import Fernet, InvalidToken
+from modules.database import add_passwords, iter_vault_batches, decrypt_entries, get_user_by_name, initialize_database
+from modules.security_utils import SCRYPT_MAX_MEMORY
+from modules.breach_corpus import is_password_breached
+
+IMPORT_BATCH_SIZE = 1000
+EXPORT_BATCH_SIZE = 500
+EXPORT_FORMAT = "toolkit-vault"
+EXPORT_VERSION = 1
+EXPORT_SALT_BYTES = 16
+EXPORT_KDF_PARAMS = {'n': 2 ** 15, 'r': 8, 'p': 1}
+
+# Column names used by the supported exports, most specific first:
+# toolkit (label, password), Chrome (name, url, username, password, note),
+# Firefox (url, username, password, httpRealm, ...) and Bitwarden
+# (name, login_uri, login_username, login_password, ...). Bitwarden's JSON
+# export nests the login_* fields in a "login" object; see _flatten_login.
+LABEL_FIELDS = ('label', 'name', 'title', 'url', 'login_uri', 'origin', 'hostname')
+USERNAME_FIELDS = ('username', 'login_username')
+PASSWORD_FIELDS = ('password', 'login_password')
+
+# Export file: a JSON header line (format, KDF parameters, salt and a check
+# token), then one Fernet token per line holding {"label", "password"},
+# encrypted under a key derived from the export passphrase with scrypt.
+def _derive_fernet(passphrase, salt, params):
+    key = hashlib.scrypt(passphrase.encode(), salt=salt, n=params['n'], r=params['r'], p=params['p'],
+                         maxmem=SCRYPT_MAX_MEMORY, dklen=32)
+    return Fernet(base64.urlsafe_b64encode(key))
+
+def _first(record, fields):
+    for field in fields:
+        value = record.get(field)
+        if isinstance(value, str) and value:
+            return value
+    return ""
+
+def _flatten_login(item):
+    # {"name", "login": {"username", "password", "uris": [{"uri"}]}} -> the CSV column names
+    login = item.get('login')
+    if not isinstance(login, dict):
+        return item
+    uris = login.get('uris')
+    uri = uris[0] if isinstance(uris, list) and uris else {}
+    return {**item, 'login_username': login.get('username'), 'login_password': login.get('password'),
+            'login_uri': uri.get('uri') if isinstance(uri, dict) else None}
+
+def _to_entry(record):
+    if not isinstance(record, dict):
+        return None
+    record = {str(key).strip().lower(): value for key, value in record.items()}
+    password = _first(record, PASSWORD_FIELDS)
+    if not password:
+        return None
+    label = _first(record, LABEL_FIELDS).strip() or "Imported"
+    username = _first(record, USERNAME_FIELDS).strip()
+    return (f"{label} ({username})" if username else label), password
+
+def _read_header(path):
+    with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+        line = f.readline()
+    try:
+        header = json.loads(line)
+    except ValueError:
+        return None
+    return header if isinstance(header, dict) and header.get('format') == EXPORT_FORMAT else None
+
+def detect_format(path):
+    if path.lower().endswith(".csv"):
+        return "csv"
+    if path.lower().endswith(".json"):
+        return "json"
+    return "export" if _read_header(path) else "jsonl"
+
+def _header_params(header):
+    # The header comes from an untrusted file; reject anything scrypt or Fernet would choke on
+    params = {name: header.get(name) for name in EXPORT_KDF_PARAMS}
+    if header.get('kdf') != 'scrypt' or not all(type(value) is int and value > 0 for value in params.values()):
+        raise ValueError("Vault export has invalid key derivation parameters")
+    n, r, p = params['n'], params['r'], params['p']
+    if n < 2 or n & (n - 1) or 128 * r * n > SCRYPT_MAX_MEMORY or r * p >= 2 ** 30:
+        raise ValueError("Vault export has invalid key derivation parameters")
+    try:
+        salt = base64.b64decode(header.get('salt'), validate=True)
+    except (TypeError, binascii.Error):
+        salt = b""
+    if not salt:
+        raise ValueError("Vault export has an invalid salt")
+    if not isinstance(header.get('check'), str):
+        raise ValueError("Vault export is missing its passphrase check")
+    return salt, params
+
+def _open_export(path, passphrase):
+    header = _read_header(path)
+    if header is None or header.get('version') != EXPORT_VERSION:
+        raise ValueError("Not a supported vault export")
+    salt, params = _header_params(header)
+    fernet = _derive_fernet(passphrase, salt, params)
+    try:
+        fernet.decrypt(header['check'].encode())
+    except InvalidToken:
+        raise ValueError("Wrong passphrase for this export")
+    return fernet
+
+def _iter_records(f, fmt, fernet=None):
+    # Yields parsed records, or None for lines that cannot be read
+    if fmt == "csv":
+        yield from csv.DictReader(f)
+        return
+    if fmt == "json":
+        # A single JSON document (Bitwarden's {"items": [...]}, or a list of
+        # records) has to be parsed whole; .json files holding one record per
+        # line fall through to the JSON Lines reader below
+        try:
+            document = json.load(f)
+        except ValueError:
+            f.seek(0)
+        else:
+            if isinstance(document, dict) and document.get('encrypted'):
+                raise ValueError("Encrypted Bitwarden exports are not supported; export as unencrypted JSON")
+            items = document.get('items') if isinstance(document, dict) else document
+            if not isinstance(items, list):
+                raise ValueError("JSON file has no list of items to import")
+            for item in items:
+                yield _flatten_login(item) if isinstance(item, dict) else None
+            return
+    if fmt == "export":
+        f.readline()
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(fernet.decrypt(line.encode()) if fernet else line)
+        except (ValueError, InvalidToken):
+            yield None
+
+def import_vault(user_id, path, passphrase=None, fmt=None, batch_size=IMPORT_BATCH_SIZE, progress=None):
+    fmt = fmt or detect_format(path)
+    fernet = _open_export(path, passphrase or "") if fmt == "export" else None
+    result = {'format': fmt, 'imported': 0, 'skipped': 0, 'breached': 0}
+
+    with open(path, "r", encoding="utf-8-sig", errors="replace", newline="") as f:
+        batch = []
+        for record in _iter_records(f, fmt, fernet):
+            entry = _to_entry(record)
+            if entry is None:
+                result['skipped'] += 1
+                continue
+            result['breached'] += is_password_breached(entry[1])
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                result['imported'] += add_passwords(user_id, batch)
+                batch = []
+                if progress:
+                    progress(result['imported'])
+        if batch:
+            result['imported'] += add_passwords(user_id, batch)
+    return result
+
+def export_vault(user_id, path, passphrase, batch_size=EXPORT_BATCH_SIZE):
+    salt = secrets.token_bytes(EXPORT_SALT_BYTES)
+    fernet = _derive_fernet(passphrase, salt, EXPORT_KDF_PARAMS)
+    header = {'format': EXPORT_FORMAT, 'version': EXPORT_VERSION, 'kdf': 'scrypt', **EXPORT_KDF_PARAMS,
+              'salt': base64.b64encode(salt).decode(), 'check': fernet.encrypt(EXPORT_FORMAT.encode()).decode()}
+
+    exported = 0
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(header) + "\n")
+        for entries in iter_vault_batches(user_id, batch_size):
+            decrypt_entries(entries)
+            f.writelines(fernet.encrypt(json.dumps({'label': e.label, 'password': e.password}).encode()).decode() + "\n"
+                         for e in entries)
+            exported += len(entries)
+    os.replace(tmp_path, path)
+    return exported
+
+def main(argv=None):
+    import getpass
+
+    parser = argparse.ArgumentParser(description="Import passwords into, or export them from, a user's vault")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("username")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "json", "jsonl", "export"], help="input format (default: detect)")
+    args = parser.parse_args(argv)
+
+    initialize_database()
+    user = get_user_by_name(args.username)
+    if not user:
+        print(f"  ✗ Unknown user: {args.username}")
+        return 1
+
+    if args.action == "export":
+        count = export_vault(user[0], args.path, getpass.getpass("  Export passphrase: "))
+        print(f"  ✓ Exported {count} passwords to {args.path}")
+        return 0
+
+    fmt = args.format or detect_format(args.path)
+    passphrase = getpass.getpass("  Export passphrase: ") if fmt == "export" else None
+    result = import_vault(user[0], args.path, passphrase, fmt)
+    print(f"  ✓ Imported {result['imported']} passwords ({result['skipped']} rows skipped, "
+          f"{result['breached']} found in breach corpus)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())